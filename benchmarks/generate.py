@@ -0,0 +1,229 @@
+import os
+import sys
+import argparse
+
+# the generator writes through the same (optionally compressing) output as write_mps
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pysmps.mps_writer import _open_write, _BufferedLines
+
+# columns are marked integer in runs of this many columns
+INTEGER_RUN = 64
+
+BOUND_TYPES = ("UP", "LO", "FX", "MI", "PL", "FR")
+INTEGER_BOUND_TYPES = ("BV", "UI", "LI")
+ROW_TYPES = ("L", "G", "E")
+
+def _value(value):
+    return "%.6g" % value
+
+# Splits n items into the given number of contiguous periods; returns the first index of
+# every period plus n.
+def _period_starts(n, periods):
+    return [n * p // periods for p in range(periods + 1)]
+
+# The (row, column) pairs of the matrix, sorted by column. Every column gets about
+# density * rows entries, drawn from the rows of its own and of the next period so that
+# multi-period instances have a staircase structure.
+def _entries(rng, rows, cols, density, periods):
+    import numpy as np
+    row_starts = _period_starts(rows, periods)
+    col_starts = _period_starts(cols, periods)
+    col_period = np.repeat(np.arange(periods), np.diff(col_starts))
+    low = np.array(row_starts[:-1])[col_period]
+    high = np.array(row_starts[2:] + [rows])[col_period]
+    counts = np.maximum(rng.binomial(rows, density, size=cols), 1)
+    columns = np.repeat(np.arange(cols), counts)
+    span = (high - low)[columns]
+    entries = low[columns] + (rng.random(len(columns)) * span).astype(np.int64)
+    order = np.lexsort((entries, columns))
+    columns, entries = columns[order], entries[order]
+    unique = np.ones(len(columns), dtype=bool)
+    unique[1:] = (columns[1:] != columns[:-1]) | (entries[1:] != entries[:-1])
+    return entries[unique], columns[unique]
+
+# public
+# Writes a synthetic MPS file with rows constraints, cols variables and about
+# density * rows * cols nonzeros. rhs, bounds and ranges give the number of RHS, BOUNDS and
+# RANGES groups, integers the share of columns inside INTORG/INTEND markers. The same
+# arguments always give the same file. Files ending with .gz, .bz2 or .xz are compressed.
+# Returns the number of nonzeros of the constraint matrix.
+def generate_mps(path, rows, cols, density, rhs=1, bounds=1, ranges=1, integers=0.1, seed=0, name="SYNTH"):
+    return len(_generate_mps(path, rows, cols, density, rhs, bounds, ranges, integers, seed, 1, name)[0])
+
+# returns the (row, column) pairs of the matrix as two numpy arrays
+def _generate_mps(path, rows, cols, density, rhs, bounds, ranges, integers, seed, periods, name):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    row_names = ["R" + str(i) for i in range(rows)]
+    col_names = ["C" + str(j) for j in range(cols)]
+    entries, columns = _entries(rng, rows, cols, density, periods)
+    values = np.round(rng.uniform(-100.0, 100.0, size=len(entries)), 2).tolist()
+    objective = np.round(rng.uniform(-10.0, 10.0, size=cols), 2).tolist()
+    runs = rng.random((cols + INTEGER_RUN - 1) // INTEGER_RUN) < integers
+    integral = np.repeat(runs, INTEGER_RUN)[:cols]
+    starts = np.searchsorted(columns, np.arange(cols + 1)).tolist()
+    matrix = entries, columns
+    entries = entries.tolist()
+
+    with _open_write(path) as writer:
+        out = _BufferedLines(writer)
+        out.append("NAME          " + name + "\n")
+        out.append("ROWS\n")
+        out.append(" N  OBJ\n")
+        for i, kind in enumerate(rng.integers(0, len(ROW_TYPES), size=rows).tolist()):
+            out.append(" " + ROW_TYPES[kind] + "  " + row_names[i] + "\n")
+
+        out.append("COLUMNS\n")
+        marked = False
+        for j in range(cols):
+            if integral[j] != marked:
+                marked = not marked
+                out.append("    MARKER    'MARKER'      '" + ("INTORG" if marked else "INTEND") + "'\n")
+            column = col_names[j]
+            line = "    " + column + "  OBJ  " + _value(objective[j])
+            for k in range(starts[j], starts[j + 1]):
+                if line is None:
+                    line = "    " + column + "  " + row_names[entries[k]] + "  " + _value(values[k])
+                else:
+                    out.append(line + "  " + row_names[entries[k]] + "  " + _value(values[k]) + "\n")
+                    line = None
+            if line is not None:
+                out.append(line + "\n")
+        if marked:
+            out.append("    MARKER    'MARKER'      'INTEND'\n")
+
+        if rhs:
+            out.append("RHS\n")
+        for group in range(rhs):
+            for i in np.flatnonzero(rng.random(rows) < 0.5).tolist():
+                out.append("    RHS" + str(group) + "  " + row_names[i] + "  " + _value(rng.uniform(-1000.0, 1000.0)) + "\n")
+
+        if ranges:
+            out.append("RANGES\n")
+        for group in range(ranges):
+            for i in np.flatnonzero(rng.random(rows) < 0.05).tolist():
+                out.append("    RNG" + str(group) + "  " + row_names[i] + "  " + _value(rng.uniform(1.0, 100.0)) + "\n")
+
+        if bounds:
+            out.append("BOUNDS\n")
+        for group in range(bounds):
+            chosen = np.flatnonzero(rng.random(cols) < 0.2).tolist()
+            kinds = rng.integers(0, len(BOUND_TYPES), size=len(chosen)).tolist()
+            for j, kind in zip(chosen, kinds):
+                kind = INTEGER_BOUND_TYPES[kind % 3] if integral[j] else BOUND_TYPES[kind]
+                if kind in ("FR", "PL", "BV"):
+                    out.append(" " + kind + " BND" + str(group) + "  " + col_names[j] + "\n")
+                else:
+                    out.append(" " + kind + " BND" + str(group) + "  " + col_names[j] + "  " + _value(rng.uniform(-10.0, 100.0)) + "\n")
+
+        out.append("ENDATA\n")
+        out.flush()
+    return matrix
+
+# public
+# Writes path + ".cor", ".tim" and ".sto" of a synthetic SMPS instance with the given number of
+# periods. The rows and columns are split into contiguous periods (given implicitly in the
+# .tim file) and the .sto file has indep INDEP DISCRETE entries, blocks BLOCKS DISCRETE
+# blocks of block_size elements and lintr LINTR blocks of block_size elements and two random
+# variables each, all placed in later periods with the given number of realizations.
+# rhs, bounds, ranges and integers are those of generate_mps and compression is a suffix like
+# ".gz" added to all three files. Returns the number of nonzeros.
+def generate_smps(path, rows, cols, density, periods=2, indep=10, blocks=10, lintr=2, block_size=4, realizations=4,
+                  rhs=1, bounds=1, ranges=1, integers=0.1, seed=0, name="SYNTH", compression=""):
+    import numpy as np
+    if periods < 2:
+        raise ValueError('The number of periods ' + str(periods) + ' is too small for a stochastic instance!')
+    entries, columns = _generate_mps(path + ".cor" + compression, rows, cols, density, rhs, bounds, ranges, integers,
+                                     seed, periods, name)
+    rng = np.random.default_rng([seed, 1])
+    row_starts = _period_starts(rows, periods)
+    col_starts = _period_starts(cols, periods)
+    period_names = ["T" + str(p + 1) for p in range(periods)]
+
+    with _open_write(path + ".tim" + compression) as writer:
+        writer.write("TIME          " + name + "\nPERIODS\n")
+        for p in range(periods):
+            writer.write("    C" + str(col_starts[p]) + "  R" + str(row_starts[p]) + "  " + period_names[p] + "\n")
+        writer.write("ENDATA\n")
+
+    # the random elements are RHS entries of later period rows and coefficients of those rows,
+    # all distinct
+    later = np.flatnonzero(entries >= row_starts[1])
+    rng.shuffle(later)
+    later = later.tolist()
+    columns = columns.tolist()
+    rhs_rows = rng.permutation(np.arange(row_starts[1], rows)).tolist()
+    def element():
+        if rhs_rows and (not later or rng.random() < 0.5):
+            row = rhs_rows.pop()
+            return "RHS", row
+        k = later.pop()
+        return "C" + str(columns[k]), int(entries[k])
+    def period(row):
+        return period_names[int(np.searchsorted(row_starts, row, side="right")) - 1]
+    probability = _value(1.0 / realizations)
+
+    with _open_write(path + ".sto" + compression) as writer:
+        out = _BufferedLines(writer)
+        out.append("STOCH         " + name + "\n")
+        if indep:
+            out.append("INDEP         DISCRETE\n")
+        for _ in range(indep):
+            col, row = element()
+            for value in rng.uniform(1.0, 100.0, size=realizations).tolist():
+                out.append("    " + col + "  R" + str(row) + "  " + _value(value) + "  " + period(row) + "  " + probability + "\n")
+
+        if blocks:
+            out.append("BLOCKS        DISCRETE\n")
+        for block in range(blocks):
+            elements = [element() for _ in range(block_size)]
+            for _ in range(realizations):
+                out.append(" BL BLOCK" + str(block) + "  " + period(elements[0][1]) + "  " + probability + "\n")
+                for col, row in elements:
+                    out.append("    " + col + "  R" + str(row) + "  " + _value(rng.uniform(1.0, 100.0)) + "\n")
+
+        if lintr:
+            out.append("BLOCKS        LINTR\n")
+        for block in range(lintr):
+            elements = [element() for _ in range(block_size)]
+            out.append(" BL LINTR" + str(block) + "  " + period(elements[0][1]) + "\n")
+            for col, row in elements:
+                out.append("    " + col + "  R" + str(row) + "  " + _value(rng.uniform(1.0, 100.0)) + "\n")
+            out.append(" RV U" + str(block) + "  NORMAL  0.0  " + period(elements[0][1]) + "  1.0\n")
+            for col, row in elements:
+                out.append("    " + col + "  R" + str(row) + "  " + _value(rng.uniform(-1.0, 1.0)) + "\n")
+            out.append(" RV V" + str(block) + "  UNIFORM  0.0  " + period(elements[0][1]) + "  2.0\n")
+            for col, row in elements[: (block_size + 1) // 2]:
+                out.append("    " + col + "  R" + str(row) + "  " + _value(rng.uniform(-1.0, 1.0)) + "\n")
+
+        out.append("ENDATA\n")
+        out.flush()
+    return len(entries)
+
+# The shape of a synthetic instance with about nnz nonzeros and per_column entries per column,
+# with twice as many columns as rows.
+def instance_shape(nnz, per_column=8):
+    cols = max(int(nnz) // per_column, 2)
+    rows = max(cols // 2, 2)
+    return rows, cols, min(per_column / rows, 1.0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes a synthetic MPS file or SMPS instance.")
+    parser.add_argument("path", help="output file, or the common prefix of the .cor, .tim and .sto files with --smps")
+    parser.add_argument("--nnz", type=float, default=1e5, help="approximate number of nonzeros")
+    parser.add_argument("--per-column", type=int, default=8)
+    parser.add_argument("--rhs", type=int, default=1)
+    parser.add_argument("--bounds", type=int, default=1)
+    parser.add_argument("--ranges", type=int, default=1)
+    parser.add_argument("--integers", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--smps", action="store_true")
+    parser.add_argument("--periods", type=int, default=2)
+    args = parser.parse_args()
+    rows, cols, density = instance_shape(args.nnz, args.per_column)
+    options = dict(rhs=args.rhs, bounds=args.bounds, ranges=args.ranges, integers=args.integers, seed=args.seed)
+    if args.smps:
+        nnz = generate_smps(args.path, rows, cols, density, periods=args.periods, **options)
+    else:
+        nnz = generate_mps(args.path, rows, cols, density, **options)
+    print(rows, "rows,", cols, "columns,", nnz, "nonzeros")
@@ -0,0 +1,112 @@
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate import generate_mps, generate_smps, instance_shape
+from pysmps import read_mps, read_smps
+
+# the reader configurations timed for every instance
+CONFIGURATIONS = {
+    "mps": ("mps", {}),
+    "mps-sparse": ("mps", {"sparse": True}),
+    "mps-mmap": ("mps", {"mmap": True}),
+    "mps-mmap-sparse": ("mps", {"mmap": True, "sparse": True}),
+    "smps": ("smps", {}),
+}
+DEFAULT_SIZES = (1e4, 1e5, 1e6, 1e7)
+
+# The generated instances are kept in directory and only written again if missing, so
+# repeated runs (and runs against a baseline) read exactly the same files.
+def instance(directory, kind, nnz, seed, compression):
+    rows, cols, density = instance_shape(nnz)
+    path = os.path.join(directory, "%s-%d-%d" % (kind, nnz, seed))
+    if kind == "mps":
+        files = [path + ".mps" + compression]
+        if not os.path.exists(files[0]):
+            generate_mps(files[0], rows, cols, density, seed=seed)
+        return files[0], files
+    files = [path + suffix + compression for suffix in (".cor", ".tim", ".sto")]
+    if not all(os.path.exists(name) for name in files):
+        generate_smps(path, rows, cols, density, seed=seed, compression=compression)
+    return path, files
+
+def read(kind, path, options):
+    return read_mps(path, **options) if kind == "mps" else read_smps(path, **options)
+
+# the fastest of repeat parses and the peak of traced memory of one more parse
+def measure(kind, path, options, repeat, memory):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        read(kind, path, options)
+        times.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        read(kind, path, options)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return min(times), peak
+
+# the results of the current run which are slower than in baseline by more than tolerance
+def regressions(results, baseline, tolerance):
+    before = dict(((r["configuration"], r["nnz"]), r["time"]) for r in baseline)
+    slower = []
+    for result in results:
+        key = (result["configuration"], result["nnz"])
+        if key in before and result["time"] > before[key] * (1 + tolerance):
+            slower.append((result, before[key]))
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times read_mps and read_smps on synthetic instances.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES, help="approximate numbers of nonzeros")
+    parser.add_argument("--configurations", nargs="+", choices=sorted(CONFIGURATIONS), default=sorted(CONFIGURATIONS))
+    parser.add_argument("--directory", default=os.path.join(tempfile.gettempdir(), "pysmps-benchmark"),
+                        help="where the generated instances are kept")
+    parser.add_argument("--compression", default="", choices=("", ".gz", ".bz2", ".xz"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results of an earlier run written with --json to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+    os.makedirs(args.directory, exist_ok=True)
+
+    results = []
+    print("%-16s %10s %10s %12s %10s %10s" % ("reader", "nnz", "time [s]", "nnz/s", "MB/s", "peak [MB]"))
+    for nnz in args.sizes:
+        for name in args.configurations:
+            kind, options = CONFIGURATIONS[name]
+            path, files = instance(args.directory, kind, int(nnz), args.seed, args.compression)
+            size = sum(os.path.getsize(source) for source in files)
+            seconds, peak = measure(kind, path, options, args.repeat, args.memory)
+            results.append({"configuration": name, "nnz": int(nnz), "bytes": size, "time": seconds,
+                            "nnz_per_second": nnz / seconds, "bytes_per_second": size / seconds, "peak_memory": peak})
+            print("%-16s %10d %10.3f %12.0f %10.1f %10s" % (name, nnz, seconds, nnz / seconds, size / seconds / 1e6,
+                                                           "-" if peak is None else "%.1f" % (peak / 1e6)))
+            sys.stdout.flush()
+
+    if args.json:
+        with open(args.json, "w") as writer:
+            json.dump(results, writer, indent=1)
+    if args.baseline:
+        with open(args.baseline) as reader:
+            slower = regressions(results, json.load(reader), args.tolerance)
+        for result, before in slower:
+            print("regression: %s at %d nonzeros takes %.3fs instead of %.3fs" % (result["configuration"], result["nnz"],
+                                                                               result["time"], before))
+        return 1 if slower else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+# The readers and the writer are loaded on first access, so importing pysmps itself is cheap
+# and has no side effects; numpy and scipy are only imported by the functions using them.
+import importlib
+
+# public names and the submodule defining them
+_EXPORTS = {
+    "read_mps": "mps_loader",
+    "iter_mps": "mps_loader",
+    "MPS": "mps_loader",
+    "ParseProfile": "mps_loader",
+    "ParseCancelled": "mps_loader",
+    "read_smps": "smps_loader",
+    "SMPS": "smps_loader",
+    "write_mps": "mps_writer",
+    "read_many": "batch_loader",
+    "LoadResult": "batch_loader",
+    "aread_mps": "async_loader",
+    "aread_smps": "async_loader",
+}
+_SUBMODULES = ("mps_loader", "smps_loader", "mps_writer", "batch_loader", "async_loader")
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module("." + _EXPORTS[name], __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES))
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import functools
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .mps_loader import read_mps
+from .smps_loader import read_smps
+
+# the number of parses running at the same time in one event loop unless a limiter is given;
+# read when the first parse of a loop starts
+PARSE_LIMIT = 4
+
+_limiters = weakref.WeakKeyDictionary()
+_threads = None
+
+def _default_limiter(loop):
+    if loop not in _limiters:
+        _limiters[loop] = asyncio.Semaphore(PARSE_LIMIT)
+    return _limiters[loop]
+
+# parses run in their own threads so they never wait behind other work of the default executor
+def _default_executor():
+    global _threads
+    if _threads is None:
+        _threads = ThreadPoolExecutor(thread_name_prefix="pysmps")
+    return _threads
+
+def _release(loop, limiter):
+    try:
+        loop.call_soon_threadsafe(limiter.release)
+    except RuntimeError:
+        # the loop was closed in the meantime
+        pass
+
+# Runs read(path, **kwargs) in executor once limiter has a free slot. The slot is only given
+# back when the parse has actually stopped, not as soon as the awaiting task is cancelled, so
+# cancelled parses still count against the limit until they are gone.
+async def _parse(read, path, executor, limiter, kwargs):
+    loop = asyncio.get_running_loop()
+    limiter = limiter or _default_limiter(loop)
+    await limiter.acquire()
+    cancel = threading.Event()
+    try:
+        if isinstance(executor, ProcessPoolExecutor):
+            # events can not be shared with other processes, so a cancelled parse which already
+            # started runs to its end there
+            from .batch_loader import _read_worker, _restore
+            future = executor.submit(_read_worker, path, kwargs, read)
+        else:
+            future = (executor or _default_executor()).submit(functools.partial(read, path, **dict(kwargs, cancel=cancel)))
+    except BaseException:
+        limiter.release()
+        raise
+    future.add_done_callback(lambda _: _release(loop, limiter))
+    try:
+        result = await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # a parse which did not start yet is dropped by wrap_future, a running one stops at
+        # its next batch of lines
+        cancel.set()
+        raise
+    if isinstance(executor, ProcessPoolExecutor):
+        result = await loop.run_in_executor(_default_executor(), _restore, result)
+    return result
+
+# public
+# Reads the MPS file under path without blocking the event loop, see read_mps for the keyword
+# arguments. The parse runs in executor, a thread pool of this module by default; a
+# concurrent.futures.ProcessPoolExecutor runs it in another process and sends the instance
+# back in the compact form of read_many. limiter is an asyncio.Semaphore capping the parses
+# running at the same time, by default one per event loop with PARSE_LIMIT slots. Cancelling
+# the task stops a parse running in a thread at its next batch of lines.
+async def aread_mps(path, executor=None, limiter=None, **kwargs):
+    return await _parse(read_mps, path, executor, limiter, kwargs)
+
+# public
+# read_smps like aread_mps; in a thread the time and stochastic files are read while the core
+# file is parsed (prefetch=True of read_smps).
+async def aread_smps(path, executor=None, limiter=None, **kwargs):
+    return await _parse(read_smps, path, executor, limiter, dict(kwargs, prefetch=kwargs.get("prefetch", True)))
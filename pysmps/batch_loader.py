@@ -0,0 +1,76 @@
+import os
+from collections import namedtuple
+
+from .mps_loader import MPS, read_mps, _find_file
+from .smps_loader import SMPS, read_smps
+
+# index is the position of path in the paths given to read_many; either result is the MPS or
+# SMPS instance or error is the exception raised while reading it
+LoadResult = namedtuple("LoadResult", ["index", "path", "result", "error"])
+
+SMPS_SUFFIXES = (".cor", ".tim", ".sto")
+
+# path names an MPS file (possibly compressed) if it is a file and an SMPS instance otherwise,
+# e.g. also if it is the directory next to the .cor, .tim and .sto files
+def _is_mps(path):
+    return os.path.isfile(_find_file(path))
+
+# the number of bytes to read for path, 0 if it does not exist
+def _source_size(path):
+    if _is_mps(path):
+        return os.path.getsize(_find_file(path))
+    sources = [_find_file(os.fspath(path) + suffix) for suffix in SMPS_SUFFIXES]
+    return sum(os.path.getsize(source) for source in sources if os.path.exists(source))
+
+def _read(path, kwargs):
+    return read_mps(path, **kwargs) if _is_mps(path) else read_smps(path, **kwargs)
+
+# Runs in the worker processes with read (read_mps or read_smps) or, if it is None, the reader
+# chosen by _is_mps. The result is sent back as the flat arrays of the parse cache, which
+# pickle as plain bytes, instead of the nested dicts of the instance.
+def _read_worker(path, kwargs, read=None):
+    result = _read(path, kwargs) if read is None else read(path, **kwargs)
+    return isinstance(result, SMPS), result._dump()
+
+def _restore(message):
+    smps, (header, arrays) = message
+    return SMPS._restore(header, arrays) if smps else MPS._restore(header, arrays)
+
+# public
+# Reads every path in paths (MPS files, or SMPS instances given as path without the .cor,
+# .tim and .sto suffixes) with workers processes and yields a LoadResult per path. The
+# largest files are started first. Results are yielded as they finish, or in the order of
+# paths if ordered=True. An error reading one path is reported in its LoadResult and does not
+# stop the others. Further keyword arguments are passed to read_mps or read_smps.
+def read_many(paths, workers=None, ordered=False, **kwargs):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    if kwargs.get("profile") is not None:
+        raise ValueError('The option profile can not be used with read_many!')
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for index, path in enumerate(paths):
+            try:
+                yield LoadResult(index, path, _read(path, kwargs), None)
+            except Exception as error:
+                yield LoadResult(index, path, None, error)
+        return
+
+    order = sorted(range(len(paths)), key=lambda index: -_source_size(paths[index]))
+    pool = ProcessPoolExecutor(min(workers, max(len(paths), 1)))
+    try:
+        futures = [None] * len(paths)
+        for index in order:
+            futures[index] = pool.submit(_read_worker, paths[index], kwargs)
+        index_of = dict((future, index) for index, future in enumerate(futures))
+        for future in futures if ordered else as_completed(futures):
+            index = index_of[future]
+            try:
+                result = _restore(future.result())
+            except Exception as error:
+                yield LoadResult(index, paths[index], None, error)
+            else:
+                yield LoadResult(index, paths[index], result, None)
+    finally:
+        # leaving the loop early cancels the files not started yet
+        pool.shutdown(cancel_futures=True)
@@ -1,7 +1,16 @@
-import re
 import math
-import copy
+import time
+import io
+import os
+import sys
+import mmap
 import warnings
+import functools
+import itertools
+import importlib
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping, MutableMapping
 
 CORE_FILE_ROW_MODE = "ROWS"
 CORE_FILE_COL_MODE = "COLUMNS"
@@ -24,7 +33,7 @@ CORE_FILE_SOS_MODE_FIRST_LINE = "SOS_FIRST_LINE"
 
 ROW_MODE_OBJ = "N"
 
-MODE = {CORE_FILE_ROW_MODE: 0, CORE_FILE_COL_MODE: 1, CORE_FILE_RHS_MODE: 3,
+MODE = {CORE_FILE_ROW_MODE: 0, CORE_FILE_COL_MODE: 1, CORE_FILE_RANGES_MODE: 2, CORE_FILE_RHS_MODE: 3,
          CORE_FILE_BOUNDS_MODE: 4, CORE_FILE_BOUNDS_MODE_NAME_GIVEN: 5,
          CORE_FILE_BOUNDS_MODE_NO_NAME: 6, CORE_FILE_RHS_MODE_NAME_GIVEN: 7,
          CORE_FILE_RHS_MODE_NO_NAME: 8, CORE_FILE_RANGES_MODE_NAME_GIVEN: 9,
@@ -66,10 +75,520 @@ STOCH_FILE_INDEP_DISCRETE_MODE = "INDEP_DISCRETE"
 STOCH_FILE_INDEP_DISTRIB_MODE = "INDEP_DISTRIB"
 
 
-warnings.simplefilter("always", ImportWarning)
-warnings.warn("""pysmps: Backwards compatibility to pre-2.0 versions has been abolished. Install older versions for code adjusted to the old interface, e.g. via \r\n
-              pip install 'pysmps<2.0'\r\n""", category=ImportWarning, stacklevel=2)
-warnings.simplefilter("default", ImportWarning)
+# Lines are read in batches of roughly this many bytes and split with plain str.split().
+# Target for the tokenizer alone is at least 1 million lines per second on a single core
+# (about 1.5 million for typical COLUMNS lines on a current machine).
+TOKENIZER_BATCH_SIZE = 1 << 20
+
+# buffer size used when reading (and decompressing) input files
+READ_BUFFER_SIZE = 1 << 22
+
+# number of characters at the start of a file looked at to tell free from fixed format
+FORMAT_SAMPLE_SIZE = 1 << 16
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma", ".lzma": "lzma"}
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "lzma"}
+
+# returns the name of the module needed to decompress path or None for plain files
+def _compression(path):
+    path = os.fspath(path)
+    for suffix, module in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            return module
+    with open(path, "rb") as reader:
+        head = reader.read(6)
+    for magic, module in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return module
+    return None
+
+# returns path or, if it does not exist, its first existing compressed variant
+def _find_file(path):
+    path = os.fspath(path)
+    if os.path.exists(path):
+        return path
+    for suffix in COMPRESSION_SUFFIXES:
+        if os.path.exists(path + suffix):
+            return path + suffix
+    return path
+
+# public
+# raised by read_mps and read_smps once the event passed as cancel=... is set
+class ParseCancelled(Exception):
+    pass
+
+def _check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise ParseCancelled('The parse was cancelled!')
+
+# checks cancel before every batch of lines the tokenizer reads
+class _CancellableReader:
+    
+    def __init__(self, reader, cancel):
+        self.reader = reader
+        self.cancel = cancel
+    
+    def readlines(self, hint=-1):
+        _check_cancel(self.cancel)
+        return self.reader.readlines(hint)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.reader.close()
+
+# opens path as a text stream, compressed files are decompressed on the fly; path may also be
+# a text stream already. With cancel (e.g. a threading.Event) reading stops once it is set.
+def _open(path, buffer_size=READ_BUFFER_SIZE, cancel=None):
+    if hasattr(path, "readlines"):
+        reader = path
+    elif _compression(path) is None:
+        reader = open(path, "r", buffering=buffer_size)
+    else:
+        raw = importlib.import_module(_compression(path)).open(path, "rb")
+        reader = io.TextIOWrapper(io.BufferedReader(raw, buffer_size))
+    return reader if cancel is None else _CancellableReader(reader, cancel)
+
+# FIXED FORMAT
+# Fixed format MPS files place the fields of data lines in the columns 2-3, 5-12, 15-22, 25-36,
+# 40-47 and 50-61, so names may contain spaces. Section headers start in column 1.
+FIXED_FIELDS = ((1, 3), (4, 12), (14, 22), (24, 36), (39, 47), (49, 61))
+FIXED_SEPARATORS = (0, 3, 12, 13, 22, 23, 36, 37, 38, 47, 48)
+MPS_FORMATS = ("free", "fixed")
+
+# yields the fields of the data and header lines of a fixed format batch in the same form
+# _tokenize yields for free format lines; the empty first field of COLUMNS, RHS and RANGES
+# lines is dropped. The slicing is inlined as this is the hot loop for fixed format files.
+def _fixed_tokens(lines):
+    for line in lines:
+        if not line[:1].isspace():
+            if line.startswith("*"):
+                continue
+            fields = line.split()
+            if fields and fields[0] == "NAME" and line[4:].strip():
+                fields = ["NAME", line[4:].strip()]
+            if fields:
+                yield fields
+            continue
+        fields = [line[1:3].strip(), line[4:12].strip(), line[14:22].strip(), line[24:36].strip(), line[39:47].strip(), line[49:61].strip()]
+        if fields[2] == "'MARKER'":
+            yield [fields[1], "'MARKER'"] + line[24:].split()[:1]
+            continue
+        while fields and not fields[-1]:
+            fields.pop()
+        if fields and not fields[0]:
+            del fields[0]
+        if fields and fields[0] != "*":
+            yield fields
+
+def _is_float(field):
+    try:
+        float(field)
+    except ValueError:
+        return False
+    return True
+
+# whether the characters of line only lie inside the fixed format fields
+def _fits_fixed(line):
+    line = line.rstrip()
+    return "\t" not in line and len(line) <= 61 and all(line[i:i + 1] in ("", " ") for i in FIXED_SEPARATORS)
+
+# whether the whitespace separated fields of a data line make sense in the given section
+def _free_line_valid(section, fields):
+    if section == CORE_FILE_ROW_MODE:
+        return len(fields) == 2
+    if section in (CORE_FILE_COL_MODE, CORE_FILE_RHS_MODE, CORE_FILE_RANGES_MODE):
+        if len(fields) > 1 and fields[1] == "'MARKER'":
+            return True
+        return len(fields) in (3, 5) and all(map(_is_float, fields[2::2]))
+    if section == CORE_FILE_BOUNDS_MODE:
+        if len(fields) == 3:
+            return fields[0] in ("FR", "MI", "PL", "BV")
+        return len(fields) == 4 and _is_float(fields[3])
+    return True
+
+def _fixed_line_valid(section, line):
+    if section in (CORE_FILE_COL_MODE, CORE_FILE_RHS_MODE, CORE_FILE_RANGES_MODE):
+        if line[14:22].strip() == "'MARKER'":
+            return True
+        return not line[1:3].strip() and all(_is_float(f) for f in (line[24:36].strip(), line[49:61].strip()) if f)
+    if section == CORE_FILE_BOUNDS_MODE:
+        return _is_float(line[24:36].strip()) if line[24:36].strip() else True
+    return True
+
+# Returns the format decided by the first line of lines which can only be read in one of
+# them: "free" for a data line not fitting the fixed layout and "fixed" for one that fits it
+# but can not be read in free format, i.e. has a name containing spaces. None means that all
+# lines read the same in both formats. section is the section the lines start in; the one
+# they end in is returned as well, so the scan can go on with the next batch.
+def _detect_format(lines, section=None):
+    for line in lines:
+        if line.startswith("*") or not line.strip():
+            continue
+        if not line[:1].isspace():
+            section = line.split()[0]
+            continue
+        if not _fits_fixed(line) or not _fixed_line_valid(section, line):
+            return "free", section
+        if not _free_line_valid(section, line.split()):
+            return "fixed", section
+    return None, section
+
+# the format of the file under path as decided by its first batch of lines, None if they read
+# the same in both formats. whole goes on with the next batches until a line decides it.
+def _file_format(path, batch_size=FORMAT_SAMPLE_SIZE, whole=False):
+    section = None
+    with _open(path) as reader:
+        for lines in iter(functools.partial(reader.readlines, batch_size), []):
+            format, section = _detect_format(lines, section)
+            if format is not None or not whole:
+                return format
+    return None
+
+# PROFILING
+# public
+# Passed to read_mps or read_smps as profile=..., this collects the wall time, the number of
+# lines, bytes (characters of the decompressed text) and tokens and, if tracemalloc=True, the
+# peak of traced memory of every section read, in file order. The profile is attached to the
+# result as its profile attribute. Readers without a profile do not pay for any of this.
+class ParseProfile:
+    
+    def __init__(self, tracemalloc=False):
+        self.tracemalloc = tracemalloc
+        # the tracemalloc module, only imported if asked for
+        self._tracemalloc = importlib.import_module("tracemalloc") if tracemalloc else None
+        self.sections = []
+        self._current = None
+        self._start = None
+        self._baseline = 0
+        self._file = None
+        self._depth = 0
+        self._tracing = False
+    
+    # read_mps and read_smps wrap every file they read in _begin and _end; tracemalloc is
+    # started for the outermost call if it is not running yet and stopped again afterwards
+    def _begin(self, path):
+        self._close()
+        self._file = os.path.basename(os.fspath(path))
+        if self._depth == 0 and self._tracemalloc is not None and not self._tracemalloc.is_tracing():
+            self._tracemalloc.start()
+            self._tracing = True
+        self._depth += 1
+    
+    def _end(self):
+        self._close()
+        self._depth -= 1
+        if self._depth == 0 and self._tracing:
+            self._tracemalloc.stop()
+            self._tracing = False
+    
+    def _enter(self, section, lines=0, size=0, tokens=0):
+        self._close()
+        self._current = {"file": self._file, "section": section, "time": 0.0, "lines": lines, "bytes": size,
+                         "tokens": tokens, "peak_memory": None}
+        if self._tracemalloc is not None and self._tracemalloc.is_tracing():
+            self._tracemalloc.reset_peak()
+            self._baseline = self._tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+    
+    def _close(self):
+        current = self._current
+        if current is None:
+            return
+        current["time"] = time.perf_counter() - self._start
+        if self._tracemalloc is not None and self._tracemalloc.is_tracing():
+            current["peak_memory"] = self._tracemalloc.get_traced_memory()[1] - self._baseline
+        self.sections.append(current)
+        self._current = None
+    
+    # Passes the fields of the lines through like _tokenize and counts them. A section starts
+    # at every line beginning in column 1 with one of the keywords; as the readers consume the
+    # fields lazily, its time includes building the model from it.
+    def _tokens(self, lines, split, keywords):
+        for line in lines:
+            fields = split(line)
+            if fields and fields[0] in keywords and not line[:1].isspace():
+                self._enter(fields[0])
+            elif self._current is None:
+                self._enter(None)
+            current = self._current
+            current["lines"] += 1
+            current["bytes"] += len(line)
+            current["tokens"] += len(fields)
+            if fields and not line.startswith("*") and fields[0] != "*":
+                yield fields
+    
+    # the sections as a list of dicts with the keys file, section, time (in seconds), lines,
+    # bytes, tokens, tokens_per_second and peak_memory (the peak of traced memory above the
+    # start of the section in bytes, None without tracemalloc); sections scanned via mmap
+    # have no token count
+    def report(self):
+        report = []
+        for section in self.sections:
+            entry = dict(section)
+            entry["tokens_per_second"] = section["tokens"] / section["time"] if section["tokens"] is not None and section["time"] > 0 else None
+            report.append(entry)
+        return report
+    
+    def __repr__(self):
+        return repr(self.report())
+
+def _fixed_line(line):
+    return next(_fixed_tokens([line]), [])
+
+# yields the fields of every line that is neither empty nor a comment; format is "free",
+# "fixed" or None to detect it. With a profile the lines are counted per section, the
+# sections starting at lines with one of the given keywords.
+def _tokenize(reader, batch_size=TOKENIZER_BATCH_SIZE, format="free", profile=None, keywords=None):
+    for batch in _token_batches(reader, batch_size, format, profile, keywords):
+        yield from batch
+
+# _tokenize yielding the fields of the lines in lists, one per batch of lines read (or, with a
+# profile, per line so the sections are timed as they are consumed)
+def _token_batches(reader, batch_size=TOKENIZER_BATCH_SIZE, format="free", profile=None, keywords=None):
+    if format is not None and format not in MPS_FORMATS:
+        raise ValueError('The format ' + str(format) + ' does not exist!')
+    # Without a format it is detected on a first batch of at least FORMAT_SAMPLE_SIZE characters
+    # and the file is read as free if no line of it decides.
+    if format is None:
+        lines = reader.readlines(max(batch_size, FORMAT_SAMPLE_SIZE))
+        format = _detect_format(lines)[0] or "free"
+    else:
+        lines = reader.readlines(batch_size)
+    while lines:
+        if profile is not None:
+            split = _fixed_line if format == "fixed" else str.split
+            for fields in profile._tokens(lines, split, SECTION_KEYWORDS if keywords is None else keywords):
+                yield [fields]
+        elif format == "fixed":
+            yield list(_fixed_tokens(lines))
+        else:
+            batch = []
+            for line in lines:
+                if line.startswith("*"):
+                    continue
+                fields = line.split()
+                if fields and fields[0] != "*":
+                    batch.append(fields)
+            yield batch
+        lines = reader.readlines(batch_size)
+
+VARIABLE_TYPES = ["Continuous", "Integer", "Semi-Continuous"]
+VARIABLE_TYPE_CODES = dict((_type, code) for code, _type in enumerate(VARIABLE_TYPES))
+VARIABLE_FIELDS = ("type", "lower", "upper")
+
+# The default variable table keeps type codes and bounds of all columns in flat arrays.
+class _VariableTable(Mapping):
+    
+    def __init__(self):
+        self.index = {}
+        self.names = []
+        self.types = array("b")
+        self.lower = array("d")
+        self.upper = array("d")
+    
+    def add(self, name, _type, lower, upper):
+        col = self.index.get(name)
+        if col is None:
+            col = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.types.append(VARIABLE_TYPE_CODES[_type])
+            self.lower.append(lower)
+            self.upper.append(upper)
+        else:
+            self._set(col, "type", _type)
+            self._set(col, "lower", lower)
+            self._set(col, "upper", upper)
+        return col
+    
+    def _get(self, col, key):
+        if key == "type":
+            return VARIABLE_TYPES[self.types[col]]
+        if key == "lower":
+            return self.lower[col]
+        if key == "upper":
+            return self.upper[col]
+        raise KeyError(key)
+    
+    def _set(self, col, key, value):
+        if key == "type":
+            if value not in VARIABLE_TYPE_CODES:
+                raise ValueError('Unknown variable type ' + str(value) + '!')
+            self.types[col] = VARIABLE_TYPE_CODES[value]
+        elif key == "lower":
+            self.lower[col] = value
+        elif key == "upper":
+            self.upper[col] = value
+        else:
+            raise KeyError(key)
+    
+    def __getitem__(self, name):
+        return _VariableView(self, self.index[name])
+    
+    def __contains__(self, name):
+        return name in self.index
+    
+    def __iter__(self):
+        return iter(self.names)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def __repr__(self):
+        return repr(dict((name, dict(variable)) for name, variable in self.items()))
+
+# A BOUNDS group only stores the bounds it modifies on top of the default variable table,
+# again in flat arrays; NaN and -1 mark bounds and types the group does not change.
+class _BoundsGroup(Mapping):
+    
+    def __init__(self, base):
+        self.base = base
+        self.positions = {}
+        self.cols = array("q")
+        self.types = array("b")
+        self.lower = array("d")
+        self.upper = array("d")
+    
+    def _get(self, col, key):
+        k = self.positions.get(col)
+        if k is not None:
+            if key == "type":
+                if self.types[k] >= 0:
+                    return VARIABLE_TYPES[self.types[k]]
+            elif key == "lower":
+                if self.lower[k] == self.lower[k]:
+                    return self.lower[k]
+            elif key == "upper":
+                if self.upper[k] == self.upper[k]:
+                    return self.upper[k]
+        return self.base._get(col, key)
+    
+    def _set(self, col, key, value):
+        if key == "type" and value not in VARIABLE_TYPE_CODES:
+            raise ValueError('Unknown variable type ' + str(value) + '!')
+        if key not in VARIABLE_FIELDS:
+            raise KeyError(key)
+        k = self.positions.get(col)
+        if k is None:
+            k = self.positions[col] = len(self.cols)
+            self.cols.append(col)
+            self.types.append(-1)
+            self.lower.append(math.nan)
+            self.upper.append(math.nan)
+        if key == "type":
+            self.types[k] = VARIABLE_TYPE_CODES[value]
+        elif key == "lower":
+            self.lower[k] = value
+        else:
+            self.upper[k] = value
+    
+    def update_variable(self, name, mod):
+        col = self.base.index.get(name)
+        if col is None:
+            raise ValueError('The variable ' + name + ' does not exist!')
+        for key, value in mod.items():
+            self._set(col, key, value)
+    
+    # the bounds changed by this group as a dict of dicts
+    @property
+    def overrides(self):
+        overrides = {}
+        for col, k in self.positions.items():
+            override = {}
+            if self.types[k] >= 0:
+                override["type"] = VARIABLE_TYPES[self.types[k]]
+            if self.lower[k] == self.lower[k]:
+                override["lower"] = self.lower[k]
+            if self.upper[k] == self.upper[k]:
+                override["upper"] = self.upper[k]
+            overrides[self.base.names[col]] = override
+        return overrides
+    
+    def __getitem__(self, name):
+        return _VariableView(self, self.base.index[name])
+    
+    def __contains__(self, name):
+        return name in self.base.index
+    
+    def __iter__(self):
+        return iter(self.base.names)
+    
+    def __len__(self):
+        return len(self.base.names)
+    
+    # returns a full, independent copy of the group as a dict of dicts
+    def materialize(self):
+        return dict((name, dict(variable)) for name, variable in self.items())
+    
+    def __repr__(self):
+        return repr(self.materialize())
+
+# dict-like view on a single variable of a variable table or BOUNDS group
+class _VariableView(MutableMapping):
+    
+    __slots__ = ("_table", "_col")
+    
+    def __init__(self, table, col):
+        self._table = table
+        self._col = col
+    
+    def __getitem__(self, key):
+        return self._table._get(self._col, key)
+    
+    def __setitem__(self, key, value):
+        self._table._set(self._col, key, value)
+    
+    def __delitem__(self, key):
+        raise TypeError("Variable attributes can not be deleted!")
+    
+    def __iter__(self):
+        return iter(VARIABLE_FIELDS)
+    
+    def __len__(self):
+        return len(VARIABLE_FIELDS)
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+# RHS and offset groups only store the values given in the file, all other rows default to 0
+class _SparseGroup(MutableMapping):
+    
+    def __init__(self, rows, default=0):
+        self.rows = rows
+        self.default = default
+        self.entries = {}
+    
+    def __getitem__(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            return value
+        if key in self.rows:
+            return self.default
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        if key not in self.rows:
+            raise KeyError(key)
+        self.entries[key] = value
+    
+    def __delitem__(self, key):
+        del self.entries[key]
+    
+    def __contains__(self, key):
+        return key in self.rows
+    
+    def __iter__(self):
+        return iter(self.rows)
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def materialize(self):
+        return dict((key, self.entries.get(key, self.default)) for key in self.rows)
+    
+    def __repr__(self):
+        return repr(self.materialize())
 
 # public
 class MPS:
@@ -79,13 +598,26 @@ class MPS:
         self.name = "No Name"
         self.objectives = {}
         self.variables = {}
-        self._variables = {}
+        self._variables = _VariableTable()
         self.constraints = {}
         self.rhs = {}
         self.offsets = {}
         self.ranges = {}
         #self.sos = {}
         
+        # name <-> position in the constraint matrix, assigned in the order rows and columns are declared
+        self._row_index = {}
+        self._row_names = []
+        self._obj_index = {}
+        self._obj_names = []
+        self._col_index = self._variables.index
+        self._col_names = self._variables.names
+        # array-backed COO buffers (row, col, value), only used in sparse mode
+        self._coo = None
+        self._obj_coo = None
+        # ParseProfile of the read_mps call, if one was given
+        self.profile = None
+        
         self.curr_rhs = -1
         self.curr_bnd = -1
         self.curr_range = -1
@@ -100,21 +632,34 @@ class MPS:
     def _set_name(self, name):
         self.name = name
     
+    def _use_coo(self):
+        self._coo = (array("q"), array("q"), array("d"))
+        self._obj_coo = (array("q"), array("q"), array("d"))
+    
+    def is_sparse(self):
+        return self._coo is not None
+    
     def add_objective(self, name):
-        self.objectives[name] = {"coefficients": {}}
+        if name not in self._obj_index:
+            self._obj_index[name] = len(self._obj_names)
+            self._obj_names.append(name)
+        if self._coo is not None:
+            self.objectives[name] = {}
+        else:
+            self.objectives[name] = {"coefficients": {}}
     
         
     # returns the list of names of possible boundary configurations
     def objective_names(self):
-        return list(self.objectives.keys())
+        return list(self._obj_names)
     def bnd_names(self):
         return list(self.variables.keys())
     def rhs_names(self):
         return list(self.rhs.keys())
     def variable_names(self):
-        return list(self._variables.keys())
+        return list(self._col_names)
     def constraint_names(self):
-        return list(self.constraints.keys())
+        return list(self._row_names)
     def range_names(self):
         return list(self.ranges.keys())
     #def sos_names(self):
@@ -122,7 +667,9 @@ class MPS:
     
     
     
-    def get_variables(self):
+    def get_variables(self, materialize=False):
+        if materialize:
+            return self.variables[self.curr_bnd].materialize()
         return self.variables[self.curr_bnd]
     def get_rhs(self):
         return self.rhs[self.curr_rhs]
@@ -136,15 +683,127 @@ class MPS:
         return self.ranges[self.curr_range]
     
     
+    # INDEX LAYER
+    # constraints, objectives and variables are numbered from 0 in the order of declaration,
+    # all array exports use these indices
+    def row_index(self, name):
+        try:
+            return self._row_index[name]
+        except KeyError:
+            raise ValueError('The row ' + str(name) + ' does not exist!') from None
+    def objective_index(self, name):
+        try:
+            return self._obj_index[name]
+        except KeyError:
+            raise ValueError('The objective ' + str(name) + ' does not exist!') from None
+    def col_index(self, name):
+        try:
+            return self._col_index[name]
+        except KeyError:
+            raise ValueError('The variable ' + str(name) + ' does not exist!') from None
+    def row_name(self, i):
+        return self._row_names[i]
+    def objective_name(self, i):
+        return self._obj_names[i]
+    def col_name(self, j):
+        return self._col_names[j]
+    
+    def row_indices(self, names):
+        import numpy as np
+        return np.fromiter(map(self.row_index, names), dtype=np.int64)
+    def col_indices(self, names):
+        import numpy as np
+        return np.fromiter(map(self.col_index, names), dtype=np.int64)
+    
     def _add_constraint(self, name, constr):
+        if name not in self._row_index:
+            self._row_index[name] = len(self._row_names)
+            self._row_names.append(name)
         self.constraints[name] = constr
         
     def _set_coefficient(self, row, variable, value):
-        if row in self.objectives:
+        if self._coo is not None:
+            if row in self._obj_index:
+                rows, cols, vals = self._obj_coo
+                rows.append(self._obj_index[row])
+            else:
+                rows, cols, vals = self._coo
+                rows.append(self._row_index[row])
+            cols.append(self._col_index[variable])
+            vals.append(value)
+        elif row in self.objectives:
             self.objectives[row]["coefficients"][variable] = value
         else:
             self.constraints[row]["coefficients"][variable] = value
     
+    # bulk variant of _set_coefficient taking row (objective) and column indices as arrays
+    def _add_coefficients(self, rows, cols, vals, objective=False):
+        if self._coo is not None:
+            for buffer, data in zip(self._obj_coo if objective else self._coo, (rows, cols, vals)):
+                buffer.extend(data)
+            return
+        names = self._obj_names if objective else self._row_names
+        target = self.objectives if objective else self.constraints
+        for i, j, value in zip(rows, cols, vals):
+            target[names[i]]["coefficients"][self._col_names[j]] = value
+    
+    # MATRIX EXPORT
+    # walks the coefficient dicts in dict mode, otherwise hands out the COO buffers
+    def _coo_arrays(self, objective=False):
+        import numpy as np
+        if self._coo is not None:
+            rows, cols, vals = self._obj_coo if objective else self._coo
+        else:
+            rows, cols, vals = self._walk_coefficients(objective)
+        return (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(vals, dtype=np.float64))
+    
+    def _walk_coefficients(self, objective=False):
+        index = self._obj_index if objective else self._row_index
+        table = self.objectives if objective else self.constraints
+        rows, cols, vals = array("q"), array("q"), array("d")
+        for name, i in index.items():
+            coefficients = table[name]["coefficients"]
+            rows.extend([i] * len(coefficients))
+            cols.extend(self._col_index[var] for var in coefficients)
+            vals.extend(coefficients.values())
+        return rows, cols, vals
+    
+    # duplicate entries in COLUMNS follow the same rule as everything else: the one given last counts
+    @staticmethod
+    def _last_wins(rows, cols, vals, ncols):
+        import numpy as np
+        keys = rows.astype(np.int64) * max(ncols, 1) + cols
+        _, first = np.unique(keys[::-1], return_index=True)
+        keep = np.sort(len(keys) - 1 - first)
+        return rows[keep], cols[keep], vals[keep]
+    
+    def _to_compressed(self, fmt):
+        from scipy import sparse
+        rows, cols, vals = self._coo_arrays()
+        shape = (len(self._row_index), len(self._col_index))
+        build = sparse.csr_matrix if fmt == "csr" else sparse.csc_matrix
+        matrix = build((vals, (rows, cols)), shape=shape)
+        if matrix.nnz < len(vals):
+            rows, cols, vals = MPS._last_wins(rows, cols, vals, shape[1])
+            matrix = build((vals, (rows, cols)), shape=shape)
+        return matrix
+    
+    def to_csr(self):
+        return self._to_compressed("csr")
+    
+    def to_csc(self):
+        return self._to_compressed("csc")
+    
+    def objective_vector(self, name=None):
+        import numpy as np
+        if name is None:
+            name = self._obj_names[0]
+        rows, cols, vals = self._coo_arrays(objective=True)
+        mask = rows == self.objective_index(name)
+        c = np.zeros(len(self._col_index))
+        c[cols[mask]] = vals[mask]
+        return c
+    
     
     #def add_sos(self, name, degree):
     #    if name in self.sos:
@@ -162,16 +821,41 @@ class MPS:
         if name not in self.variables:
             raise ValueError('The boundary group ' + name + ' does not exist!')
         self.curr_bnd = name
+        return self.variables[name]
     
     def _add_variable(self, name, _type):
-        self._variables[name] = {"type": _type, "lower": self.defaults[_type]["lower"], "upper": self.defaults[_type]["upper"]}
+        self._variables.add(name, _type, self.defaults[_type]["lower"], self.defaults[_type]["upper"])
     def _update_variable(self, variable, mod):
-        self.variables[self.curr_bnd][variable].update(mod)
+        self.variables[self.curr_bnd].update_variable(variable, mod)
+    
+    # returns lower bounds, upper bounds and type codes (see VARIABLE_TYPES) of all variables
+    # w.r.t. the given or attached BOUNDS group as numpy arrays ordered as variable_names()
+    def bound_vectors(self, group=None):
+        import numpy as np
+        table = self._variables
+        lower = np.array(table.lower, dtype=np.float64)
+        upper = np.array(table.upper, dtype=np.float64)
+        types = np.array(table.types, dtype=np.int8)
+        if group is None:
+            if len(self.variables) == 0:
+                return lower, upper, types
+            group = self.curr_bnd
+        if group not in self.variables:
+            raise ValueError('The boundary group ' + str(group) + ' does not exist!')
+        group = self.variables[group]
+        cols = np.array(group.cols, dtype=np.int64)
+        for target, values in [(lower, np.array(group.lower)), (upper, np.array(group.upper))]:
+            mask = ~np.isnan(values)
+            target[cols[mask]] = values[mask]
+        values = np.array(group.types, dtype=np.int8)
+        mask = values >= 0
+        types[cols[mask]] = values[mask]
+        return lower, upper, types
         
     def _add_bnd_group(self, name):
         if name in self.variables:
             raise ValueError('The boundary group ' + name + ' already exists!')
-        self.variables[name] = copy.deepcopy(self._variables)
+        self.variables[name] = _BoundsGroup(self._variables)
         if len(self.variables) == 2:
             warnings.warn("There are multiple boundary groups for the linear program " + self.name + ". Switch boundary group using the MPS.set_bounds_group function.", stacklevel=2)
     
@@ -192,9 +876,9 @@ class MPS:
             self.ranges[self.curr_range][constr] = {"lower": 0, "upper": abs(value)}
         elif self.constraints[constr]["type"] == "L":
             self.ranges[self.curr_range][constr] = {"lower": -abs(value), "upper": 0}
-        elif self.constraint[constr]["type"] == "E":
+        elif self.constraints[constr]["type"] == "E":
             if constr not in self.ranges[self.curr_range]:
-                self.ranges[self.curr_range] = {"lower": 0, "upper": 0}
+                self.ranges[self.curr_range][constr] = {"lower": 0, "upper": 0}
             if value < 0:
                 self.ranges[self.curr_range][constr]["lower"] = value
             else:
@@ -205,8 +889,8 @@ class MPS:
     def _add_rhs_group(self, name):
         if name in self.rhs:
             raise ValueError('The RHS group ' + name + ' already exists!')
-        self.rhs[name] = dict((constr,0) for constr in self.constraints)
-        self.offsets[name] = dict((obj,0) for obj in self.objectives)
+        self.rhs[name] = _SparseGroup(self.constraints)
+        self.offsets[name] = _SparseGroup(self.objectives)
         if len(self.rhs) == 2:
             warnings.warn("There are multiple rhs groups for the linear program " + self.name + ". Switch rhs group using the MPS.attach_rhs function.", stacklevel=2)
     
@@ -223,6 +907,20 @@ class MPS:
         else:
             raise ValueError('The row ' + constr + ' does not exist!')
         
+    def rhs_vector(self, group=None):
+        import numpy as np
+        if group is None:
+            if len(self.rhs) == 0:
+                return np.zeros(len(self._row_index))
+            group = self.curr_rhs
+        if group not in self.rhs:
+            raise ValueError('The RHS group ' + str(group) + ' does not exist!')
+        b = np.zeros(len(self._row_index))
+        entries = self.rhs[group].entries
+        if entries:
+            b[[self._row_index[constr] for constr in entries]] = list(entries.values())
+        return b
+    
     def get_curr_rhs(self):
         return self.curr_rhs
     def get_curr_bnd(self):
@@ -230,6 +928,75 @@ class MPS:
     def get_curr_range(self):
         return self.curr_range
     
+    # CACHE SERIALIZATION
+    # splits the model into a JSON-able header and flat arrays, see _write_cache
+    def _dump(self):
+        header = {"name": self.name, "defaults": self.defaults, "sparse": self.is_sparse(),
+                  "curr": [self.curr_rhs, self.curr_bnd, self.curr_range],
+                  "rhs": self.rhs_names(), "bnd": self.bnd_names(), "ranges": self.range_names()}
+        arrays = {
+            "row_names": _join_names(self._row_names),
+            "row_types": _join_names([self.constraints[name]["type"] for name in self._row_names]),
+            "obj_names": _join_names(self._obj_names),
+            "col_names": _join_names(self._col_names),
+            "col_types": self._variables.types,
+            "col_lower": self._variables.lower,
+            "col_upper": self._variables.upper,
+        }
+        for prefix, objective in [("coo", False), ("obj", True)]:
+            buffers = (self._obj_coo if objective else self._coo) if self.is_sparse() else self._walk_coefficients(objective)
+            for field, buffer in zip(("rows", "cols", "vals"), buffers):
+                arrays[prefix + "." + field] = buffer
+        for k, name in enumerate(header["rhs"]):
+            for prefix, group, index in [("rhs", self.rhs[name], self._row_index), ("offsets", self.offsets[name], self._obj_index)]:
+                arrays["%s.%d.rows" % (prefix, k)] = array("q", [index[row] for row in group.entries])
+                arrays["%s.%d.values" % (prefix, k)] = array("d", group.entries.values())
+        for k, name in enumerate(header["bnd"]):
+            group = self.variables[name]
+            for field in ("cols", "types", "lower", "upper"):
+                arrays["bnd.%d.%s" % (k, field)] = getattr(group, field)
+        for k, name in enumerate(header["ranges"]):
+            group = self.ranges[name]
+            arrays["ranges.%d.rows" % k] = array("q", [self._row_index[row] for row in group])
+            arrays["ranges.%d.lower" % k] = array("d", [bounds["lower"] for bounds in group.values()])
+            arrays["ranges.%d.upper" % k] = array("d", [bounds["upper"] for bounds in group.values()])
+        return header, arrays
+    
+    @staticmethod
+    def _restore(header, arrays):
+        defaults = header["defaults"]
+        mps = MPS({"c_lower": defaults["Continuous"]["lower"], "c_upper": defaults["Continuous"]["upper"],
+                   "i_lower": defaults["Integer"]["lower"], "i_upper": defaults["Integer"]["upper"]})
+        mps._set_name(header["name"])
+        if header["sparse"]:
+            mps._use_coo()
+        for name in _split_names(arrays["obj_names"]):
+            mps.add_objective(name)
+        for name, _type in zip(_split_names(arrays["row_names"]), _split_names(arrays["row_types"])):
+            mps._add_constraint(name, {"type": _type} if header["sparse"] else {"type": _type, "coefficients": {}})
+        table = mps._variables
+        table.names.extend(_split_names(arrays["col_names"]))
+        table.index.update(zip(table.names, range(len(table.names))))
+        table.types, table.lower, table.upper = arrays["col_types"], arrays["col_lower"], arrays["col_upper"]
+        for prefix, objective in [("coo", False), ("obj", True)]:
+            mps._add_coefficients(arrays[prefix + ".rows"], arrays[prefix + ".cols"], arrays[prefix + ".vals"], objective)
+        for k, name in enumerate(header["rhs"]):
+            mps._add_rhs_group(name)
+            for prefix, group, names in [("rhs", mps.rhs[name], mps._row_names), ("offsets", mps.offsets[name], mps._obj_names)]:
+                group.entries = dict(zip([names[i] for i in arrays["%s.%d.rows" % (prefix, k)]], arrays["%s.%d.values" % (prefix, k)]))
+        for k, name in enumerate(header["bnd"]):
+            mps._add_bnd_group(name)
+            group = mps.variables[name]
+            for field in ("cols", "types", "lower", "upper"):
+                setattr(group, field, arrays["bnd.%d.%s" % (k, field)])
+            group.positions = dict(zip(group.cols, range(len(group.cols))))
+        for k, name in enumerate(header["ranges"]):
+            mps._add_range_group(name)
+            mps.ranges[name] = dict((mps._row_names[i], {"lower": lower, "upper": upper}) for i, lower, upper in
+                                    zip(arrays["ranges.%d.rows" % k], arrays["ranges.%d.lower" % k], arrays["ranges.%d.upper" % k]))
+        mps.curr_rhs, mps.curr_bnd, mps.curr_range = header["curr"]
+        return mps
+    
     # used to produce dict
     def __iter__(self):
         yield ("name", self.name)
@@ -238,20 +1005,673 @@ class MPS:
         yield ("rhs_names", self.rhs_names())
         yield ("range_names", self.range_names())
         yield ("constraint_names", self.constraint_names())
-        yield ("variable_names", list(self._variables.keys()))
+        yield ("variable_names", self.variable_names())
         #yield ("sos_names", self.sos_names())
         yield ("objectives", self.objectives)
-        yield ("variables", self.variables)
+        yield ("variables", dict((name, group.materialize()) for name, group in self.variables.items()))
         yield ("constraints", self.constraints)
-        yield ("rhs", self.rhs)
-        yield ("offsets", self.offsets)
+        yield ("rhs", dict((name, group.materialize()) for name, group in self.rhs.items()))
+        yield ("offsets", dict((name, group.materialize()) for name, group in self.offsets.items()))
         yield ("ranges", self.ranges)
         #yield ("sos", self.sos)
 
 
-def read_mps(path, **kwargs):
+# STREAMING RECORDS
+# iter_mps yields one of these per NAME line, section header, row declaration, integer marker
+# and per entry of the COLUMNS, RHS, BOUNDS and RANGES sections, in file order
+NameRecord = namedtuple("NameRecord", ["name"])
+SectionRecord = namedtuple("SectionRecord", ["section", "group"])
+RowRecord = namedtuple("RowRecord", ["type", "name"])
+MarkerRecord = namedtuple("MarkerRecord", ["marker"])
+ColumnRecord = namedtuple("ColumnRecord", ["column", "row", "value"])
+RhsRecord = namedtuple("RhsRecord", ["group", "row", "value"])
+BoundRecord = namedtuple("BoundRecord", ["type", "group", "column", "value"])
+RangeRecord = namedtuple("RangeRecord", ["group", "row", "value"])
+
+# C-level constructors taking one (column, row, value) resp. (group, row, value) tuple, which
+# avoids the comparatively slow namedtuple __new__ for the bulk of the records
+_column_record = functools.partial(tuple.__new__, ColumnRecord)
+_rhs_record = functools.partial(tuple.__new__, RhsRecord)
+
+# section keywords; RHS, BOUNDS and RANGES lines with more than a group name are data lines
+SECTION_KEYWORDS = {"NAME", CORE_FILE_ROW_MODE, CORE_FILE_COL_MODE, CORE_FILE_RHS_MODE, CORE_FILE_BOUNDS_MODE,
+                    CORE_FILE_RANGES_MODE, CORE_FILE_SOS_MODE, CORE_FILE_ARCS_MODE, "ENDATA"}
+GROUP_SECTION_KEYWORDS = {CORE_FILE_RHS_MODE, CORE_FILE_BOUNDS_MODE, CORE_FILE_RANGES_MODE}
+
+# turns the tokenized lines of an MPS file into records
+def _records(lines):
+    ROWS, COLUMNS, RHS, BOUNDS, RANGES = (MODE[CORE_FILE_ROW_MODE], MODE[CORE_FILE_COL_MODE], MODE[CORE_FILE_RHS_MODE],
+                                          MODE[CORE_FILE_BOUNDS_MODE], MODE[CORE_FILE_RANGES_MODE])
+    SOS, SOS_FIRST_LINE = MODE[CORE_FILE_SOS_MODE], MODE[CORE_FILE_SOS_MODE_FIRST_LINE]
     mode = -1
+    for line in lines:
+        head = line[0]
+        if head in SECTION_KEYWORDS and (len(line) <= 2 or head not in GROUP_SECTION_KEYWORDS):
+            if head == "ENDATA":
+                yield SectionRecord("ENDATA", None)
+                return
+            if head == "NAME":
+                yield NameRecord(" ".join(line[1:]))
+            elif head == CORE_FILE_ARCS_MODE:
+                raise ValueError("NETWORK is currently not implemented!")
+            elif head == CORE_FILE_SOS_MODE:
+                mode = SOS_FIRST_LINE
+                yield SectionRecord(head, None)
+            else:
+                mode = MODE[head]
+                yield SectionRecord(head, line[1] if len(line) > 1 and head in GROUP_SECTION_KEYWORDS else None)
+                
+        # COL MODE
+        elif mode == COLUMNS:
+            if len(line) == 3 and line[1] != "'MARKER'":
+                yield _column_record((head, line[1], float(line[2])))
+            elif len(line) > 1 and line[1] == "'MARKER'":
+                yield MarkerRecord(line[2].strip("'"))
+            else:
+                yield from map(_column_record, zip(itertools.repeat(head), line[1::2], map(float, line[2::2])))
+                
+        elif mode == ROWS:
+            yield RowRecord(head, line[1])
+                
+        # RHS MODE
+        elif mode == RHS:
+            yield from map(_rhs_record, zip(itertools.repeat(head), line[1::2], map(float, line[2::2])))
+            
+        # BOUNDS MODE
+        elif mode == BOUNDS:
+            yield BoundRecord(head, line[1], line[2], float(line[3]) if len(line) > 3 else None)
+            
+        # RANGES MODE
+        elif mode == RANGES:
+            for row, value in zip(line[1::2], map(float, line[2::2])):
+                yield RangeRecord(head, row, value)
+                
+        # SOS MODE
+        elif mode == SOS_FIRST_LINE:
+            warnings.warn("SOS functionality is currently not supported. If your program relies on Special Ordered Set functionality the output might not be true to the file input!", stacklevel=2)
+            mode = SOS
+
+# read_mps passes COLUMNS lines to the model in batches of about this many characters, small
+# enough for the fields of a batch to stay in the CPU caches
+COLUMN_BATCH_SIZE = 1 << 14
+
+# Yields the tokenized lines given in batches except for the data lines of COLUMNS sections,
+# which parser.feed_columns takes directly from the batches. They are fed before the next
+# section header is yielded, so the records of _records still reach parser in file order.
+def _divert_columns(batches, parser):
+    columns = False
+    for batch in batches:
+        k = 0
+        while k < len(batch):
+            if columns:
+                k += parser.feed_columns(batch[k:] if k else batch)
+                if k == len(batch):
+                    break
+            line = batch[k]
+            k += 1
+            head = line[0]
+            if head in SECTION_KEYWORDS and (len(line) <= 2 or head not in GROUP_SECTION_KEYWORDS):
+                columns = head == CORE_FILE_COL_MODE
+            yield line
+
+# builds an MPS instance from the records of an MPS file
+class _MPSReader:
+    
+    def __init__(self, mps, defaults):
+        self.mps = mps
+        self.defaults = defaults
+        self.sparse = mps.is_sparse()
+        self.integral_marker = False
+        self.group = None
+        self.last_column = None
+        # the coefficient dicts of the rows by name for feed_columns in dict mode
+        self.coefficients = None
+        self.handlers = {NameRecord: self._name, SectionRecord: self._section, RowRecord: self._row,
+                         MarkerRecord: self._marker, ColumnRecord: self._column, RhsRecord: self._rhs,
+                         BoundRecord: self._bound, RangeRecord: self._range}
+    
+    # returns False once ENDATA is reached
+    def feed(self, record):
+        return self.handlers[record.__class__](record) is not False
+    
+    def _name(self, record):
+        self.mps._set_name(record.name)
+    
+    def _section(self, record):
+        mps = self.mps
+        self.group = record.group
+        if record.section == "ENDATA":
+            mps.finalize()
+            return False
+        if record.group is None:
+            return
+        if record.section == CORE_FILE_RHS_MODE:
+            if record.group not in mps.rhs:
+                mps._add_rhs_group(record.group)
+            mps.attach_rhs(record.group)
+        elif record.section == CORE_FILE_BOUNDS_MODE:
+            if record.group not in mps.variables:
+                mps._add_bnd_group(record.group)
+            mps.attach_bnd(record.group)
+        elif record.section == CORE_FILE_RANGES_MODE:
+            if record.group not in mps.ranges:
+                mps._add_range_group(record.group)
+            mps.attach_range(record.group)
     
+    def _row(self, record):
+        self.coefficients = None
+        if record.type == ROW_MODE_OBJ:
+            self.mps.add_objective(record.name)
+        elif self.sparse:
+            self.mps._add_constraint(record.name, {"type": record.type})
+        else:
+            self.mps._add_constraint(record.name, {"type": record.type, "coefficients": {}})
+    
+    def _marker(self, record):
+        if record.marker == "INTORG":
+            self.integral_marker = True
+        elif record.marker == "INTEND":
+            self.integral_marker = False
+    
+    def _column(self, record):
+        mps = self.mps
+        column = record.column
+        if column != self.last_column:
+            self.last_column = column
+            if column not in mps._variables:
+                mps._add_variable(column, COL_TYPES[self.integral_marker])
+        mps._set_coefficient(record.row, column, record.value)
+
+    # Bulk variant of _marker and _column for tokenized COLUMNS data lines, used by read_mps
+    # instead of one ColumnRecord per coefficient. Stops at the first section header and
+    # returns the number of lines read before it.
+    def feed_columns(self, lines):
+        mps = self.mps
+        last = self.last_column
+        j = None if last is None else mps._col_index[last]
+        # in sparse mode constraint entries go straight into the COO buffers
+        coo = mps._coo
+        if coo is not None:
+            coo_rows, coo_cols, coo_vals = coo
+            row_index = mps._row_index
+        elif self.coefficients is None:
+            self.coefficients = self._coefficients()
+        coefficients = self.coefficients
+        for k, line in enumerate(lines):
+            if len(line) > 1 and line[1] == "'MARKER'":
+                self._marker(MarkerRecord(line[2].strip("'")))
+                continue
+            column = line[0]
+            if column != last:
+                if column in SECTION_KEYWORDS and (len(line) <= 2 or column not in GROUP_SECTION_KEYWORDS):
+                    self.last_column = last
+                    return k
+                last = column
+                if column not in mps._variables:
+                    mps._add_variable(column, COL_TYPES[self.integral_marker])
+                j = mps._col_index[column]
+            if coo is not None:
+                for row, value in zip(line[1::2], map(float, line[2::2])):
+                    i = row_index.get(row)
+                    if i is None:
+                        mps._set_coefficient(row, column, value)
+                    else:
+                        coo_rows.append(i)
+                        coo_cols.append(j)
+                        coo_vals.append(value)
+                continue
+            for row, value in zip(line[1::2], map(float, line[2::2])):
+                coefficients[row][column] = value
+        self.last_column = last
+        return len(lines)
+    
+    # the coefficient dict of every row by name, objectives first like in MPS._set_coefficient
+    def _coefficients(self):
+        mps = self.mps
+        coefficients = dict((name, row["coefficients"]) for name, row in mps.constraints.items())
+        coefficients.update((name, row["coefficients"]) for name, row in mps.objectives.items())
+        return coefficients
+    
+    # feed_columns for the raw lines of a memory-mapped COLUMNS section, given in batches;
+    # row_names maps the raw row names of the ROWS section to their names. cancel is checked
+    # before every batch. Names are looked up by their raw bytes, so each column name is only
+    # decoded once.
+    def feed_columns_bytes(self, batches, row_names, cancel=None):
+        mps = self.mps
+        coo = mps._coo
+        # rows by raw name: the index in sparse mode, inverted (~i) for objectives, otherwise
+        # the coefficient dict
+        if coo is not None:
+            coo_rows, coo_cols, coo_vals = coo
+            obj_rows, obj_cols, obj_vals = mps._obj_coo
+            rows = dict((raw, mps._row_index[name]) for raw, name in row_names.items() if name in mps._row_index)
+            rows.update((raw, ~mps._obj_index[name]) for raw, name in row_names.items() if name in mps._obj_index)
+        else:
+            named = self._coefficients()
+            rows = dict((raw, named[name]) for raw, name in row_names.items() if name in named)
+        get = rows.get
+        last = None
+        for lines in batches:
+            _check_cancel(cancel)
+            for line in map(bytes.split, lines):
+                if not line:
+                    continue
+                # comments and markers never continue the current column
+                if line[0] != last:
+                    if line[0].startswith(b"*"):
+                        continue
+                    if len(line) > 1 and line[1] == b"'MARKER'":
+                        self._marker(MarkerRecord(line[2].decode().strip("'")))
+                        continue
+                    last = line[0]
+                    column = last.decode()
+                    if column not in mps._variables:
+                        mps._add_variable(column, COL_TYPES[self.integral_marker])
+                    j = mps._col_index[column]
+                # the positions of the row names, without slicing the usual lines of 3 or 5 fields
+                n = len(line)
+                for k in (1,) if n == 3 else (1, 3) if n == 5 else range(1, n - 1, 2):
+                    target = get(line[k])
+                    value = float(line[k + 1])
+                    if target is None:
+                        mps._set_coefficient(line[k].decode(), column, value)
+                    elif coo is None:
+                        target[column] = value
+                    elif target >= 0:
+                        coo_rows.append(target)
+                        coo_cols.append(j)
+                        coo_vals.append(value)
+                    else:
+                        obj_rows.append(~target)
+                        obj_cols.append(j)
+                        obj_vals.append(value)
+    
+    def _rhs(self, record):
+        mps = self.mps
+        if self.group is not None:
+            if record.group != mps.get_curr_rhs():
+                raise Exception("Other RHS name was given even though name was set after RHS tag.")
+        elif record.group not in mps.rhs:
+            mps._add_rhs_group(record.group)
+            mps.attach_rhs(record.group)
+        mps.set_rhs(record.row, record.value)
+    
+    def _bound(self, record):
+        mps = self.mps
+        if self.group is not None:
+            if record.group != mps.get_curr_bnd():
+                raise Exception("Other BND name was given even though name was set after BND tag.")
+        elif record.group not in mps.variables:
+            mps._add_bnd_group(record.group)
+            mps.attach_bnd(record.group)
+        
+        _type, column, value = record.type, record.column, record.value
+        if _type == "UP":
+            mps._update_variable(column, {"upper": value})
+        elif _type == "UI":
+            mps._update_variable(column, {"type": "Integer", "upper": value})
+        elif _type == "LO":
+            mps._update_variable(column, {"lower": value})
+        elif _type == "LI":
+            mps._update_variable(column, {"type": "Integer", "lower": value})
+        elif _type == "FX":
+            mps._update_variable(column, {"lower": value, "upper": value})
+        elif _type == "FR":
+            mps._update_variable(column, {"lower": -math.inf, "upper": math.inf})
+        elif _type == "MI":
+            mps._update_variable(column, {"lower": -math.inf, "upper": self.defaults["MI_upper"]})
+        elif _type == "PL":
+            mps._update_variable(column, {"lower": 0.0, "upper": math.inf})
+        elif _type == "BV":
+            mps._update_variable(column, {"type": "Integer", "lower": 0.0, "upper": 1.0})
+        elif _type == "SC":
+            mps._update_variable(column, {"type": "Semi-Continuous", "lower": self.defaults["SC_lower"] if value is None else value})
+    
+    def _range(self, record):
+        mps = self.mps
+        if self.group is not None:
+            if record.group != mps.get_curr_range():
+                raise Exception("Other RANGES group tag was given even though group was set after RANGES tag.")
+        elif record.group not in mps.ranges:
+            mps._add_range_group(record.group)
+            mps.attach_range(record.group)
+        mps.add_range(record.row, record.value)
+    
+    # parses the COLUMNS section mm[start:end] of path in chunks on a process pool and merges
+    # the chunks in file order, carrying the INTORG/INTEND state across chunk boundaries;
+    # cancel is checked before every chunk is merged
+    def feed_columns_parallel(self, path, mm, start, end, workers, cancel=None):
+        from concurrent.futures import ProcessPoolExecutor
+        mps = self.mps
+        rows = dict((name.encode(), i) for name, i in mps._row_index.items())
+        objectives = dict((name.encode(), i) for name, i in mps._obj_index.items())
+        chunk_size = max(PARALLEL_MIN_CHUNK_SIZE, (end - start) // (4 * workers))
+        bounds = [start]
+        while bounds[-1] < end:
+            newline = mm.find(b"\n", min(bounds[-1] + chunk_size, end) - 1, end)
+            bounds.append(end if newline < 0 else newline + 1)
+        state = self.integral_marker
+        pool = ProcessPoolExecutor(workers, initializer=_init_columns_worker, initargs=(rows, objectives))
+        try:
+            for names, markers, final, coo, obj in pool.map(_parse_columns_chunk, [path] * (len(bounds) - 1), bounds[:-1], bounds[1:]):
+                _check_cancel(cancel)
+                mapping = array("q")
+                for name, marker in zip(names, markers):
+                    col = name.decode()
+                    if col not in mps._variables:
+                        mps._add_variable(col, COL_TYPES[state if marker < 0 else marker])
+                    mapping.append(mps._col_index[col])
+                for (chunk_rows, chunk_cols, chunk_vals), objective in [(coo, False), (obj, True)]:
+                    mps._add_coefficients(chunk_rows, array("q", map(mapping.__getitem__, chunk_cols)), chunk_vals, objective)
+                if final >= 0:
+                    state = final
+        finally:
+            # a cancelled parse drops the chunks not started yet
+            pool.shutdown(cancel_futures=True)
+        self.integral_marker = bool(state)
+
+
+# PARALLEL COLUMNS PARSING
+# COLUMNS sections are split into chunks of at least this many bytes, smaller sections are parsed serially
+PARALLEL_MIN_CHUNK_SIZE = 1 << 22
+
+# constraint and objective rows (raw bytes -> index) of the file parsed by a pool worker
+_worker_rows = None
+
+def _init_columns_worker(rows, objectives):
+    global _worker_rows
+    _worker_rows = (rows, objectives)
+
+# Returns the raw names of the columns in the order of their first appearance, the marker state
+# (1 integral, 0 continuous, -1 not set within this chunk) at these appearances, the marker state at
+# the end of the chunk and the COO arrays of constraint and objective entries with chunk-local columns.
+def _parse_columns_chunk(path, start, end):
+    rows, objectives = _worker_rows
+    names, markers, index = [], [], {}
+    marker = -1
+    coo = (array("q"), array("q"), array("d"))
+    obj = (array("q"), array("q"), array("d"))
+    last = None
+    with open(path, "rb") as reader, mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in _byte_lines(mm, start, end):
+            line = line.split()
+            if not line or line[0].startswith(b"*"):
+                continue
+            if len(line) > 1 and line[1] == b"'MARKER'":
+                if line[2] == b"'INTORG'":
+                    marker = 1
+                elif line[2] == b"'INTEND'":
+                    marker = 0
+                continue
+            if line[0] != last:
+                last = line[0]
+                j = index.get(last)
+                if j is None:
+                    j = index[last] = len(names)
+                    names.append(last)
+                    markers.append(marker)
+            for row, value in zip(line[1::2], map(float, line[2::2])):
+                i = rows.get(row)
+                target = coo
+                if i is None:
+                    i = objectives.get(row)
+                    target = obj
+                    if i is None:
+                        raise ValueError('The row ' + row.decode() + ' does not exist!')
+                target[0].append(i)
+                target[1].append(j)
+                target[2].append(value)
+    return names, markers, marker, coo, obj
+
+# matches the section header lines of an MPS file; RHS, BOUNDS and RANGES headers carry at most a group name.
+# The keyword has to be the whole first token, like in _records, so names like NAME.1 are data.
+SECTION_HEADER_PATTERN = rb"^[ \t]*(NAME|ROWS|COLUMNS|SOS|ARCS|ENDATA|(?:RHS|BOUNDS|RANGES)(?=[ \t]*(?:\S+[ \t]*)?\r?$))(?=[ \t]|\r?$)[^\n]*"
+
+# matches the newline before every line which starts with a keyword; unlike the ^ of
+# SECTION_HEADER_PATTERN the literal newline lets re skip the other lines quickly
+SECTION_START_PATTERN = rb"\n[ \t]*(?:NAME|ROWS|COLUMNS|SOS|ARCS|ENDATA|RHS|BOUNDS|RANGES)"
+
+# re is only imported (and the patterns compiled) once a file is memory-mapped
+@functools.lru_cache(maxsize=None)
+def _section_header():
+    import re
+    return re.compile(SECTION_HEADER_PATTERN, re.M)
+
+@functools.lru_cache(maxsize=None)
+def _section_start():
+    import re
+    return re.compile(SECTION_START_PATTERN)
+
+# yields the lines of mm[start:end] in lists, copying at most batch_size bytes at a time
+def _byte_batches(mm, start, end, batch_size=TOKENIZER_BATCH_SIZE):
+    while start < end:
+        stop = min(start + batch_size, end)
+        if stop < end:
+            newline = mm.rfind(b"\n", start, stop)
+            if newline < 0:
+                newline = mm.find(b"\n", stop, end)
+            stop = end if newline < 0 else newline + 1
+        yield mm[start:stop].splitlines()
+        start = stop
+
+def _byte_lines(mm, start, end, batch_size=TOKENIZER_BATCH_SIZE):
+    return itertools.chain.from_iterable(_byte_batches(mm, start, end, batch_size))
+
+# yields name, header tokens and byte range of the body of every section of the mapped file.
+# The header pattern is only matched on the first line and on the lines starting with a keyword.
+def _sections(mm):
+    pattern = _section_header()
+    starts = itertools.chain((0,), (candidate.start() + 1 for candidate in _section_start().finditer(mm)))
+    headers = [header for header in (pattern.match(mm, start) for start in starts) if header is not None]
+    for k, header in enumerate(headers):
+        end = headers[k + 1].start() if k + 1 < len(headers) else len(mm)
+        yield header.group(1).decode(), header.group(0).decode().split(), header.end(), end
+
+# Records of a single section of the mapped file. ROWS and COLUMNS are scanned as bytes and
+# names are decoded once, all other (short) sections are decoded and tokenized as text.
+def _section_records(mm, section, header, start, end, row_names):
+    if section == CORE_FILE_ROW_MODE:
+        yield SectionRecord(section, None)
+        for line in _byte_lines(mm, start, end):
+            line = line.split()
+            if line and not line[0].startswith(b"*"):
+                row_names[line[1]] = line[1].decode()
+                yield RowRecord(line[0].decode(), row_names[line[1]])
+    elif section == CORE_FILE_COL_MODE:
+        yield SectionRecord(section, None)
+        last = None
+        for line in _byte_lines(mm, start, end):
+            line = line.split()
+            if not line or line[0].startswith(b"*"):
+                continue
+            if len(line) > 1 and line[1] == b"'MARKER'":
+                yield MarkerRecord(line[2].decode().strip("'"))
+                continue
+            if line[0] != last:
+                last = line[0]
+                column = last.decode()
+            if len(line) == 3:
+                yield _column_record((column, row_names.get(line[1]) or line[1].decode(), float(line[2])))
+                continue
+            for row, value in zip(line[1::2], map(float, line[2::2])):
+                yield _column_record((column, row_names.get(row) or row.decode(), value))
+    else:
+        lines = (line.decode().split() for line in _byte_lines(mm, start, end))
+        yield from _records(itertools.chain([header], (line for line in lines if line and not line[0].startswith("*"))))
+
+def _mmap_records(path):
+    row_names = {}
+    with open(path, "rb") as reader, mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for section, header, start, end in _sections(mm):
+            yield from _section_records(mm, section, header, start, end, row_names)
+            if section == "ENDATA":
+                return
+
+def _read_mmap(path, parser, workers=1, profile=None, cancel=None):
+    row_names = {}
+    with open(path, "rb") as reader, mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for section, header, start, end in _sections(mm):
+            _check_cancel(cancel)
+            if profile is not None:
+                line_start = mm.rfind(b"\n", 0, start) + 1
+                profile._enter(section, mm[line_start:end].count(b"\n"), end - line_start, None)
+            if section == CORE_FILE_COL_MODE and workers > 1 and end - start > PARALLEL_MIN_CHUNK_SIZE:
+                parser.feed(SectionRecord(section, None))
+                parser.feed_columns_parallel(path, mm, start, end, workers, cancel)
+                continue
+            if section == CORE_FILE_COL_MODE:
+                parser.feed(SectionRecord(section, None))
+                parser.feed_columns_bytes(_byte_batches(mm, start, end, COLUMN_BATCH_SIZE), row_names, cancel)
+                continue
+            handlers = parser.handlers
+            for record in _section_records(mm, section, header, start, end, row_names):
+                if handlers[record.__class__](record) is False:
+                    return
+
+# public
+# Streams the records of the MPS file under path in file order without building the model.
+# Uncompressed free format files are memory-mapped and scanned as bytes if mmap=True.
+# format is "free", "fixed" or None to detect it from the first lines of the file.
+def iter_mps(path, mmap=False, format=None, profile=None, cancel=None):
+    if mmap and _compression(path) is None and (format or _file_format(path) or "free") == "free":
+        yield from _mmap_records(path)
+        return
+    with _open(path, cancel=cancel) as reader:
+        yield from _records(_tokenize(reader, format=format, profile=profile))
+
+# PARSE CACHE
+# A cache file holds CACHE_MAGIC, the format version and the length of a JSON header
+# followed by the header and the raw bytes of the arrays listed in it.
+CACHE_MAGIC = b"PYSMPS-CACHE"
+CACHE_FORMAT_VERSION = 2
+# options which do not change the parsed model
+CACHE_NEUTRAL_OPTIONS = ("cache_dir", "mmap", "workers", "profile", "cancel", "prefetch")
+
+def _join_names(names):
+    return array("B", "\n".join(names).encode())
+
+def _split_names(data):
+    return data.tobytes().decode().split("\n") if len(data) else []
+
+# path, size, modification time and content hash of an input file
+def _file_signature(path):
+    import hashlib
+    stat = os.stat(path)
+    content = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as reader:
+        for chunk in iter(lambda: reader.read(READ_BUFFER_SIZE), b""):
+            content.update(chunk)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": content.hexdigest()}
+
+def _cache_file(cache_dir, paths, options):
+    import hashlib
+    options = sorted((k, repr(v)) for k, v in options.items() if k not in CACHE_NEUTRAL_OPTIONS)
+    key = repr(([os.path.abspath(path) for path in paths], options)).encode()
+    return os.path.join(cache_dir, hashlib.blake2b(key, digest_size=16).hexdigest() + ".cache")
+
+def _write_cache(path, header, arrays):
+    import json
+    import struct
+    import tempfile
+    header = dict(header, byteorder=sys.byteorder, arrays=[[name, data.typecode, len(data) * data.itemsize] for name, data in arrays.items()])
+    header = json.dumps(header).encode()
+    # a temporary file of its own for every writer, so concurrent misses in one process do not collide
+    fd, temp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as writer:
+            writer.write(CACHE_MAGIC)
+            writer.write(struct.pack("<IQ", CACHE_FORMAT_VERSION, len(header)))
+            writer.write(header)
+            for data in arrays.values():
+                writer.write(memoryview(data).cast("B"))
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+# Returns (header, arrays) or None if there is no cache file or it was written in another
+# format. Cache files only hold JSON and raw arrays, and truncated or otherwise broken ones
+# count as missing.
+def _read_cache(path):
+    import json
+    import struct
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as reader:
+        if reader.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            return None
+        try:
+            version, length = struct.unpack("<IQ", reader.read(12))
+            if version != CACHE_FORMAT_VERSION:
+                return None
+            header = json.loads(reader.read(length).decode())
+            if header["byteorder"] != sys.byteorder:
+                return None
+            arrays = {}
+            for name, typecode, nbytes in header["arrays"]:
+                data = reader.read(nbytes)
+                if len(data) != nbytes:
+                    return None
+                arrays[name] = array(typecode)
+                arrays[name].frombytes(data)
+        except (struct.error, ValueError, KeyError, TypeError):
+            return None
+    return header, arrays
+
+# loads the object parsed from paths from cache_dir if all files are unchanged, otherwise
+# parses them and stores the result
+def _cached(cache_dir, paths, options, parse, dump, restore):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_file(cache_dir, paths, options)
+    sources = [_file_signature(source) for source in paths]
+    cached = _read_cache(path)
+    if cached is not None and cached[0].get("sources") == sources:
+        return restore(*cached)
+    result = parse()
+    header, arrays = dump(result)
+    header["sources"] = sources
+    _write_cache(path, header, arrays)
+    return result
+
+def read_mps(path, **kwargs):
+    profile = kwargs.get("profile")
+    if kwargs.get("cache_dir") is not None:
+        options = dict(kwargs, cache_dir=None)
+        if profile is None:
+            return _cached(kwargs["cache_dir"], [path], options, lambda: read_mps(path, **options), MPS._dump, MPS._restore)
+        # the CACHE section covers the lookup and, on a hit, loading the cache file
+        profile._begin(path)
+        try:
+            profile._enter("CACHE")
+            mps = _cached(kwargs["cache_dir"], [path], options, lambda: read_mps(path, **options), MPS._dump, MPS._restore)
+        finally:
+            profile._end()
+        mps.profile = profile
+        return mps
+    
+    if profile is None:
+        return _read_mps(path, kwargs)
+    profile._begin(path)
+    try:
+        mps = _read_mps(path, kwargs, profile)
+    finally:
+        profile._end()
+    mps.profile = profile
+    return mps
+
+def _read_mps(path, kwargs, profile=None):
+    format = kwargs.get("format")
+    try:
+        return _parse_mps(path, kwargs, format, profile)
+    except (ValueError, KeyError, IndexError):
+        # Files whose first lines read the same in both formats are read as free. If that fails
+        # and a later line shows the file is fixed, it is read again in fixed format.
+        if format is not None or _file_format(path) is not None or _file_format(path, whole=True) != "fixed":
+            raise
+    warnings.warn("The file " + str(path) + " is in fixed format, which its first lines do not show. Pass format=\"fixed\" to read it only once.", stacklevel=3)
+    return _parse_mps(path, kwargs, "fixed", profile)
+
+def _parse_mps(path, kwargs, format, profile=None):
     default_bounds = {"c_lower": 0.0, "c_upper": math.inf, "i_lower": 0.0, "i_upper": math.inf}
     given_bounds = dict((k, kwargs[k]) for k in ['c_lower', 'c_upper', 'i_lower', 'i_upper'] if k in kwargs)
     default_bounds.update(given_bounds)
@@ -262,164 +1682,24 @@ def read_mps(path, **kwargs):
     given_defaults = dict((k, kwargs[k]) for k in ['MI_upper', 'SC_lower'] if k in kwargs)
     defaults.update(given_defaults)
     
-    integral_marker = False
+    if kwargs.get("sparse", False):
+        mps._use_coo()
+    parser = _MPSReader(mps, defaults)
     
-    with open(path, "r") as reader:
-        
-        for line in reader:
-            if line.startswith("*"):
-                continue
-
-            line = re.split(" |\t", line)
-            line = [x.strip() for x in line]
-            line = list(filter(None, line))
-            
-            if len(line) == 0:
-                continue
-            if line[0] == "ENDATA":
-                mps.finalize()
+    # compressed and fixed format files can not be mapped and are streamed instead
+    workers = kwargs.get("workers", 1)
+    if (kwargs.get("mmap", False) or workers > 1) and _compression(path) is None:
+        format = format or _file_format(path) or "free"
+        if format == "free":
+            _read_mmap(path, parser, workers, profile, kwargs.get("cancel"))
+            return mps
+    
+    handlers = parser.handlers
+    with _open(path, cancel=kwargs.get("cancel")) as reader:
+        batches = _token_batches(reader, COLUMN_BATCH_SIZE, format, profile)
+        for record in _records(_divert_columns(batches, parser)):
+            if handlers[record.__class__](record) is False:
                 break
-            if line[0] == "*":
-                continue
-            if line[0] == "NAME":
-                mps._set_name(line[1])
-                #name = line[1]
-                
-            # ROW INSTRUCTION
-            elif line[0] in [CORE_FILE_ROW_MODE, CORE_FILE_COL_MODE]:
-                mode = MODE[line[0]]
-                
-            # RHS INSTRUCTION
-            elif line[0] == CORE_FILE_RHS_MODE and len(line) <= 2:
-                if len(line) > 1:
-                    if line[1] not in mps.rhs:
-                        mps._add_rhs_group(line[1])
-                    mps.attach_rhs(line[1])
-                    
-                    mode = MODE[CORE_FILE_RHS_MODE_NAME_GIVEN]
-                else:
-                    mode = MODE[CORE_FILE_RHS_MODE_NO_NAME]
-                    
-            # BOUNDS INSTRUCTION  
-            elif line[0] == CORE_FILE_BOUNDS_MODE and len(line) <= 2:
-                if len(line) > 1:
-                    if line[1] not in mps.variables:
-                        mps._add_bnd_group(line[1])
-                    mps.attach_bnd(line[1])
-                    
-                    mode = MODE[CORE_FILE_BOUNDS_MODE_NAME_GIVEN]
-                else:
-                    mode = MODE[CORE_FILE_BOUNDS_MODE_NO_NAME]
-                    
-            # RANGES INSTRUCTION
-            elif line[0] == CORE_FILE_RANGES_MODE and len(line) <= 2:
-                if len(line) > 1:
-                    if line[1] not in mps.ranges:
-                        mps._add_range_group(line[1])
-                    mps.attach_range(line[1])
-                    
-                    mode = MODE[CORE_FILE_RANGES_MODE_NAME_GIVEN]
-                else:
-                    mode = MODE[CORE_FILE_RANGES_MODE_NO_NAME]
-                    
-            # SOS INSTRUCTION
-            elif line[0] == CORE_FILE_SOS_MODE:
-                mode = MODE[CORE_FILE_SOS_MODE_FIRST_LINE]
-                
-            
-            elif line[0] == CORE_FILE_ARCS_MODE:
-                raise ValueError("NETWORK is currently not implemented!")
-                
-                
-            elif mode == MODE[CORE_FILE_ROW_MODE]:
-                if line[0] == ROW_MODE_OBJ:
-                    mps.add_objective(line[1])
-                else:
-                    mps._add_constraint(line[1], {"type": line[0], "coefficients": {}})
-                    
-            # COL MODE
-            elif mode == MODE[CORE_FILE_COL_MODE]:
-                if len(line) > 1 and line[1] == "'MARKER'":
-                    if line[2] == "'INTORG'":
-                        integral_marker = True
-                    elif line[2] == "'INTEND'":
-                        integral_marker = False
-                    continue
-                if line[0] not in mps._variables:
-                    mps._add_variable(line[0], COL_TYPES[integral_marker])
-                j = 1
-                while j < len(line) - 1:
-                    mps._set_coefficient(line[j], line[0], float(line[j+1]))
-                    j = j + 2
-                    
-            # RHS MODE
-            elif mode in [MODE[CORE_FILE_RHS_MODE_NAME_GIVEN], MODE[CORE_FILE_RHS_MODE_NO_NAME]]:
-                if mode == MODE[CORE_FILE_RHS_MODE_NAME_GIVEN]:
-                    if line[0] != mps.get_curr_rhs():
-                        raise Exception("Other RHS name was given even though name was set after RHS tag.")
-                elif line[0] not in mps.rhs:
-                    mps._add_rhs_group(line[0])
-                    mps.attach_rhs(line[0])
-                for kk in range((len(line) - 1) // 2):
-                    idx = kk * 2
-                    mps.set_rhs(line[idx + 1], float(line[idx + 2]))
-                    
-            # SOS MODE
-            elif mode == MODE[CORE_FILE_SOS_MODE_FIRST_LINE]:
-                warnings.warn("SOS functionality is currently not supported. If your program relies on Special Ordered Set functionality the output might not be true to the file input!", stacklevel=2)
-            #    degree = int(line[0][1:])
-            #    mps.add_sos(line[2], degree, int(line[3]))
-            #    mps.attach_sos(line[2])
-                mode = MODE[CORE_FILE_SOS_MODE]
-                
-                
-            elif mode == MODE[CORE_FILE_SOS_MODE]:
-                pass
-                #mps.add_variable_to_sos(line[1], float(line[2]))
-                
-            # BOUNDS MODE
-            elif mode in [MODE[CORE_FILE_BOUNDS_MODE_NAME_GIVEN], MODE[CORE_FILE_BOUNDS_MODE_NO_NAME]]:
-                if mode == MODE[CORE_FILE_BOUNDS_MODE_NAME_GIVEN]:
-                    if line[1] != mps.get_curr_bnd():
-                        raise Exception("Other BND name was given even though name was set after BND tag.")
-                elif line[1] not in mps.variables:
-                    mps._add_bnd_group(line[1])
-                    mps.attach_bnd(line[1])
-                
-                if line[0] == "UP":
-                    mps._update_variable(line[2], {"upper": float(line[3])})
-                elif line[0] == "UI":
-                    mps._update_variable(line[2], {"type": "Integer", "upper": float(line[3])})
-                elif line[0] == "LO":
-                    mps._update_variable(line[2], {"lower": float(line[3])})
-                elif line[0] == "LI":
-                    mps._update_variable(line[2], {"type": "Integer", "lower": float(line[3])})
-                elif line[0] == "FX":
-                    mps._update_variable(line[2], {"lower": float(line[3]), "upper": float(line[3])})
-                elif line[0] == "FR":
-                    mps._update_variable(line[2], {"lower": -math.inf, "upper": math.inf})
-                elif line[0] == "MI":
-                    mps._update_variable(line[2], {"lower": -math.inf, "upper": defaults["MI_upper"]})
-                elif line[0] == "PL":
-                    mps._update_variable(line[2], {"lower": 0.0, "upper": math.inf})
-                elif line[0] == "BV":
-                    mps._update_variable(line[2], {"type": "Integer", "lower": 0.0, "upper": 1.0})
-                elif line[0] == "SC":
-                    val = defaults["SC_lower"]
-                    if len(line) > 3:
-                        val = float(line[3])
-                    mps._update_variable(line[2], {"type": "Semi-Continuous", "lower": val})
-                
-            # RANGES MODE
-            elif mode in [MODE[CORE_FILE_RANGES_MODE_NAME_GIVEN], MODE[CORE_FILE_RANGES_MODE_NO_NAME]]:
-                if mode == MODE[CORE_FILE_RANGES_MODE_NAME_GIVEN]:
-                    if line[0] != mps.get_curr_range():
-                        raise Exception("Other RANGES group tag was given even though group was set after RANGES tag.")
-                elif line[0] not in mps.ranges:
-                    mps._add_range_group(line[0])
-                    mps.attach_range(line[0])
-                
-                mps.add_range(line[1], float(line[2]))
     
     
     return mps
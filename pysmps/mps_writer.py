@@ -0,0 +1,201 @@
+import io
+import os
+import math
+import importlib
+
+from .mps_loader import COMPRESSION_SUFFIXES, MPS_FORMATS, VARIABLE_TYPES, VARIABLE_TYPE_CODES, ROW_MODE_OBJ
+
+# buffer size of the output file and number of lines joined per write call
+WRITE_BUFFER_SIZE = 1 << 22
+WRITE_BATCH_LINES = 1 << 16
+
+# Line templates placing the fields in the columns 2-3, 5-12, 15-22, 25-36, 40-47 and 50-61 of
+# fixed format. Free format files use the same templates, longer names just shift the fields.
+ROW_LINE = " %-2s %s\n"
+ENTRY_LINE = "    %-8s  %-8s  %s\n"
+ENTRY_PAIR_LINE = "    %-8s  %-8s  %-12s   %-8s  %s\n"
+BOUND_LINE = " %-2s %-8s  %-8s  %s\n"
+BOUND_FLAG_LINE = " %-2s %-8s  %s\n"
+MARKER_LINE = "    %-8s  %-8s  %-12s   %s\n"
+
+INTEGER = VARIABLE_TYPE_CODES["Integer"]
+SEMI_CONTINUOUS = VARIABLE_TYPE_CODES["Semi-Continuous"]
+
+# gzip defaults to its slowest level, which costs several times the time of level 6 for a
+# few percent in size
+COMPRESSION_OPTIONS = {"gzip": {"compresslevel": 6}, "bz2": {}, "lzma": {}}
+
+# opens path for writing, compressing the output if path ends with one of COMPRESSION_SUFFIXES
+def _open_write(path, buffer_size=WRITE_BUFFER_SIZE):
+    path = os.fspath(path)
+    for suffix, module in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            raw = importlib.import_module(module).open(path, "wb", **COMPRESSION_OPTIONS[module])
+            return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size))
+    return open(path, "w", buffering=buffer_size)
+
+def _check_names(names, format):
+    for name in names:
+        if format == "fixed":
+            if len(name) > 8:
+                raise ValueError('The name ' + name + ' is too long for fixed format!')
+        elif not name or len(name.split()) != 1 or name != name.strip():
+            raise ValueError('The name ' + repr(name) + ' can not be written in free format!')
+
+# repr is the shortest string reading back to the same float; fixed format values longer
+# than 12 characters are rounded to fit their field
+def _free_value(value):
+    return repr(float(value))
+
+def _fixed_value(value):
+    text = repr(float(value))
+    precision = 12
+    while len(text) > 12 and precision > 1:
+        precision -= 1
+        text = "%.*g" % (precision, value)
+    return text
+
+# The BOUNDS lines setting the bounds and type a group overrides for one column; lower and
+# upper are None where the group keeps the bound of the column.
+def _bound_lines(_type, lower, upper, base_lower, base_upper):
+    low = base_lower if lower is None else lower
+    up = base_upper if upper is None else upper
+    if _type == SEMI_CONTINUOUS:
+        return [("SC", low)] + ([("UP", up)] if upper is not None else [])
+    if lower is not None and low == -math.inf:
+        lines = [("FR", None)] if up == math.inf else [("MI", None), ("UP", up)]
+    elif upper is not None and up == math.inf:
+        lines = [("PL", None)] + ([("LO", low)] if low != 0 else [])
+    elif lower is not None and upper is not None and low == up:
+        lines = [("FX", low)]
+    else:
+        lines = ([("LO", low)] if lower is not None else []) + ([("UP", up)] if upper is not None else [])
+    if _type == INTEGER and lines == [("LO", 0.0), ("UP", 1.0)]:
+        lines = [("BV", None)]
+    elif _type == INTEGER:
+        for k, (kind, value) in enumerate(lines):
+            if kind in ("LO", "UP"):
+                lines[k] = ("LI" if kind == "LO" else "UI", value)
+                break
+        else:
+            lines.append(("LI", low))
+    elif _type >= 0:
+        raise ValueError('A BOUNDS group can not make a variable ' + VARIABLE_TYPES[_type] + '!')
+    return lines
+
+# the range values reproducing a stored range of a row of the given type
+def _range_values(_type, bounds):
+    if _type == "G":
+        return [bounds["upper"]]
+    if _type == "L":
+        return [-bounds["lower"]]
+    return [value for value in (bounds["lower"], bounds["upper"]) if value != 0] or [0.0]
+
+# the (row, value) entries of an RHS or RANGES group, two per line
+def _pair_lines(group, entries, value):
+    lines = [ENTRY_PAIR_LINE % (group, row, value(a), other, value(b)) for (row, a), (other, b) in zip(entries[0::2], entries[1::2])]
+    if len(entries) % 2:
+        lines.append(ENTRY_LINE % (group, entries[-1][0], value(entries[-1][1])))
+    return lines
+
+class _BufferedLines:
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.lines = []
+
+    def append(self, line):
+        self.lines.append(line)
+        if len(self.lines) >= WRITE_BATCH_LINES:
+            self.flush()
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def flush(self):
+        self.writer.write("".join(self.lines))
+        self.lines = []
+
+# Writes the COLUMNS section column by column. Objective and constraint entries are merged
+# and sorted by column once, so dict and sparse mode models are written the same way.
+def _write_columns(out, mps, value):
+    import numpy as np
+    obj_rows, obj_cols, obj_vals = mps._coo_arrays(objective=True)
+    rows, cols, vals = mps._coo_arrays()
+    names = mps._obj_names + mps._row_names
+    rows = np.concatenate((obj_rows, rows + len(mps._obj_names)))
+    cols = np.concatenate((obj_cols, cols))
+    vals = np.concatenate((obj_vals, vals))
+    order = np.argsort(cols, kind="stable")
+    rows = [names[i] for i in rows[order].tolist()]
+    vals = list(map(value, vals[order].tolist()))
+    starts = np.searchsorted(cols[order], np.arange(len(mps._col_names) + 1)).tolist()
+    types = mps._variables.types
+
+    out.append("COLUMNS\n")
+    integral = False
+    for j, column in enumerate(mps._col_names):
+        if (types[j] == INTEGER) != integral:
+            integral = not integral
+            out.append(MARKER_LINE % ("MARKER", "'MARKER'", "", "'INTORG'" if integral else "'INTEND'"))
+        start, end = starts[j], starts[j + 1]
+        if start == end:
+            # a column has to appear in COLUMNS to be declared
+            if names:
+                out.append(ENTRY_LINE % (column, names[0], value(0.0)))
+            continue
+        for k in range(start, end - 1, 2):
+            out.append(ENTRY_PAIR_LINE % (column, rows[k], vals[k], rows[k + 1], vals[k + 1]))
+        if (end - start) % 2:
+            out.append(ENTRY_LINE % (column, rows[end - 1], vals[end - 1]))
+    if integral:
+        out.append(MARKER_LINE % ("MARKER", "'MARKER'", "", "'INTEND'"))
+
+# public
+# Writes mps to path in free or fixed format, compressed if path ends with .gz, .bz2 or .xz.
+# Reading the file with read_mps (and the same default bounds) gives back the same model.
+def write_mps(mps, path, format="free"):
+    if format not in MPS_FORMATS:
+        raise ValueError('The format ' + str(format) + ' does not exist!')
+    value = _fixed_value if format == "fixed" else _free_value
+    groups = list(mps.rhs) + list(mps.variables) + list(mps.ranges)
+    _check_names(mps._obj_names + mps._row_names + mps._col_names + groups, format)
+
+    with _open_write(path) as writer:
+        out = _BufferedLines(writer)
+        out.append("NAME          " + mps.name + "\n")
+        out.append("ROWS\n")
+        out.extend(ROW_LINE % (ROW_MODE_OBJ, name) for name in mps._obj_names)
+        out.extend(ROW_LINE % (mps.constraints[name]["type"], name) for name in mps._row_names)
+        _write_columns(out, mps, value)
+
+        if mps.rhs:
+            out.append("RHS\n")
+            for name in mps.rhs:
+                entries = list(mps.offsets[name].entries.items()) + list(mps.rhs[name].entries.items())
+                out.extend(_pair_lines(name, entries, value))
+
+        if mps.ranges:
+            out.append("RANGES\n")
+            for name, group in mps.ranges.items():
+                entries = [(row, v) for row, bounds in group.items() for v in _range_values(mps.constraints[row]["type"], bounds)]
+                out.extend(_pair_lines(name, entries, value))
+
+        if mps.variables:
+            out.append("BOUNDS\n")
+            table = mps._variables
+            for name, group in mps.variables.items():
+                for col, k in group.positions.items():
+                    lower, upper = group.lower[k], group.upper[k]
+                    lines = _bound_lines(group.types[k], lower if lower == lower else None, upper if upper == upper else None,
+                                         table.lower[col], table.upper[col])
+                    column = table.names[col]
+                    for kind, v in lines:
+                        if v is None:
+                            out.append(BOUND_FLAG_LINE % (kind, name, column))
+                        else:
+                            out.append(BOUND_LINE % (kind, name, column, value(v)))
+
+        out.append("ENDATA\n")
+        out.flush()
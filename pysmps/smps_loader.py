@@ -5,11 +5,15 @@ Created on Sun Sep  8 13:28:53 2019
 @author: Julian Märte
 """
 
-import re
+import io
+import sys
 import math
-import copy
+import operator
 import warnings
-from mps_loader import MPS, read_mps
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
+from .mps_loader import MPS, read_mps, _tokenize, _open, _find_file, _cached, _file_format, _join_names, _split_names
 
 TIME_FILE_PERIODS_MODE = "PERIODS"
 TIME_FILE_PERIODS_MODE_EXPLICIT = "PERIODS_EXPLICIT"
@@ -17,6 +21,9 @@ TIME_FILE_PERIODS_MODE_IMPLICIT = "PERIODS_IMPLICIT"
 TIME_FILE_ROWS_MODE = "ROWS"
 TIME_FILE_COLS_MODE = "COLUMNS"
 
+# keywords starting a section of a time or stoch file, for ParseProfile
+TIME_FILE_SECTIONS = {"TIME", TIME_FILE_PERIODS_MODE, TIME_FILE_ROWS_MODE, TIME_FILE_COLS_MODE, "ENDATA"}
+
 TIME_MODE = {TIME_FILE_PERIODS_MODE: 0, TIME_FILE_PERIODS_MODE_EXPLICIT: 1,
               TIME_FILE_PERIODS_MODE_IMPLICIT: 2, TIME_FILE_ROWS_MODE: 3,
               TIME_FILE_COLS_MODE: 4}
@@ -32,15 +39,420 @@ STOCH_FILE_BLOCKS_SUB_MODE = "BLOCKS_SUB"
 STOCH_FILE_BLOCKS_LINTR_MODE = "BLOCKS_LINTR"
 STOCH_FILE_BLOCKS_BL_MODE = "BL"
 STOCH_FILE_SCENARIOS_MODE = "SCENARIOS"
+STOCH_FILE_SCENARIOS_DISCRETE_MODE = "SCENARIOS_DISCRETE"
+STOCH_FILE_SCENARIO_SC_MODE = "SC"
+# parent name of the scenarios branching off the core problem
+SCENARIO_ROOT = "ROOT"
+
+STOCH_FILE_SECTIONS = {"STOCH", STOCH_FILE_INDEP_MODE, STOCH_FILE_BLOCKS_MODE, STOCH_FILE_SCENARIOS_MODE, "ENDATA"}
 
 
 STOCH_MODE = {STOCH_FILE_INDEP_MODE: 0, STOCH_FILE_INDEP_DISCRETE_MODE: 1,
               STOCH_FILE_INDEP_DISTRIB_MODE: 2, STOCH_FILE_INDEP_SUB_MODE: 3,
               STOCH_FILE_BLOCKS_MODE: 4, STOCH_FILE_BLOCKS_BL_MODE: 5,
               STOCH_FILE_BLOCKS_DISCRETE_MODE: 6, STOCH_FILE_BLOCKS_SUB_MODE: 7,
-              STOCH_FILE_BLOCKS_LINTR_MODE: 8, STOCH_FILE_BLOCKS_BL_MODE: 9}
+              STOCH_FILE_BLOCKS_LINTR_MODE: 8, STOCH_FILE_BLOCKS_BL_MODE: 9,
+              STOCH_FILE_SCENARIOS_DISCRETE_MODE: 10}
+
+
+
+# A DISCRETE block. Every element gets a position, realizations are stored as the
+# (position, value) pairs in which they differ from the basecase (the first realization).
+class _DiscreteBlock(Mapping):
+    
+    FIELDS = ("type", "elements", "basecase", "probabilities")
+    
+    def __init__(self):
+        self.elements = []
+        self.positions = {}
+        self.basecase = array("d")
+        # changes of realization k are changed[ptr[k]:ptr[k+1]], values[ptr[k]:ptr[k+1]]
+        self.ptr = array("q", [0])
+        self.changed = array("q")
+        self.values = array("d")
+        self.probs = array("d")
+    
+    def add_element(self, key, value):
+        if key in self.positions:
+            self.basecase[self.positions[key]] = value
+            return
+        self.positions[key] = len(self.elements)
+        self.elements.append(key)
+        self.basecase.append(value)
+    
+    def set_value(self, key, value):
+        position = self.positions.get(key)
+        if position is None:
+            raise ValueError("The element " + str(key) + " is not part of the block!")
+        self.changed.append(position)
+        self.values.append(value)
+    
+    def close_realization(self, probability):
+        self.ptr.append(len(self.changed))
+        self.probs.append(probability)
+    
+    def __len__(self):
+        return len(self.FIELDS)
+    
+    def __iter__(self):
+        return iter(self.FIELDS)
+    
+    def __getitem__(self, key):
+        if key == "type":
+            return "DISCRETE"
+        if key == "elements":
+            return self.elements
+        if key == "basecase":
+            return list(self.basecase)
+        if key == "probabilities":
+            probabilities = {}
+            for k in range(len(self.probs)):
+                case = tuple(self.realization(k))
+                probabilities[case] = probabilities.get(case, 0) + self.probs[k]
+            return probabilities
+        raise KeyError(key)
+    
+    def realization(self, k):
+        case = list(self.basecase)
+        for i in range(self.ptr[k], self.ptr[k + 1]):
+            case[self.changed[i]] = self.values[i]
+        return case
+    
+    # all realizations as a (realizations x elements) numpy array and their probabilities
+    def realizations(self):
+        import numpy as np
+        ptr = np.array(self.ptr, dtype=np.int64)
+        cases = np.tile(np.array(self.basecase, dtype=np.float64), (len(self.probs), 1))
+        cases[np.repeat(np.arange(len(self.probs)), np.diff(ptr)), np.array(self.changed, dtype=np.int64)] = np.array(self.values, dtype=np.float64)
+        return cases, np.array(self.probs, dtype=np.float64)
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+# Parameters of the INDEP distributions as given in the two value fields of the .sto file.
+# NORMAL and LOGNORMAL take the mean and variance (of the underlying normal distribution),
+# UNIFORM the interval, BETA the two shape parameters and GAMMA the shape and scale.
+CONTINUOUS_DISTRIBUTIONS = ("UNIFORM", "NORMAL", "BETA", "GAMMA", "LOGNORMAL")
+
+def _draw(rng, distribution, first, second, size):
+    import numpy as np
+    if distribution == "UNIFORM":
+        return rng.uniform(first, second, size)
+    if distribution == "NORMAL":
+        return rng.normal(first, np.sqrt(second), size)
+    if distribution == "BETA":
+        return rng.beta(first, second, size)
+    if distribution == "GAMMA":
+        return rng.gamma(first, second, size)
+    return rng.lognormal(first, np.sqrt(second), size)
+
+# a numpy Generator for seed; streams of the same seed are independent of each other
+def _generator(seed=None, stream=None):
+    import numpy as np
+    if stream is None:
+        return np.random.default_rng(seed)
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(stream,)))
+
+# shifts the cumulative distribution of the k-th table into [k, k + 1], so one searchsorted
+# call on the concatenated tables draws from all of them
+def _shifted_cdf(probabilities, k):
+    import numpy as np
+    cdf = np.cumsum(probabilities, dtype=np.float64)
+    cdf /= cdf[-1]
+    cdf[-1] = 1.0
+    return cdf + k
+
+# Draws scenarios of the INDEP and BLOCKS distributions. Samples are drawn with one call per
+# distribution type for all its elements, one for all DISCRETE tables, one for all DISCRETE
+# blocks and one per distribution type for the random variables of the LINTR blocks.
+class _Sampler:
+    
+    def __init__(self, smps):
+        import numpy as np
+        self.elements = []
+        self.continuous = {}
+        tables = ([], [], [])
+        block_columns = {}
+        for period, distributions in smps.distributions.items():
+            for key, distribution in distributions.items():
+                column = len(self.elements)
+                self.elements.append(key)
+                _type = distribution["type"]
+                if _type == "DISCRETE":
+                    probabilities = distribution["probabilities"]
+                    tables[0].append(column)
+                    tables[1].append(np.array(list(probabilities), dtype=np.float64))
+                    tables[2].append(_shifted_cdf(list(probabilities.values()), len(tables[0]) - 1))
+                elif _type in CONTINUOUS_DISTRIBUTIONS:
+                    columns, first, second = self.continuous.setdefault(_type, ([], [], []))
+                    columns.append(column)
+                    first.append(distribution["parameters"][0])
+                    second.append(distribution["parameters"][1])
+                elif _type == "BLOCK":
+                    block_columns.setdefault((period, distribution["block"]), {})[key] = column
+                else:
+                    raise ValueError('The ' + _type + ' distribution of ' + str(key) + ' can not be sampled!')
+        self.continuous = dict((_type, (np.array(columns, dtype=np.int64), np.array(first), np.array(second)))
+                               for _type, (columns, first, second) in self.continuous.items())
+        self.tables = self._concatenate(tables)
+        blocks = ([], [], [])
+        lintr_columns = {}
+        for (period, name), columns in block_columns.items():
+            block = smps.blocks[period][name]
+            if block["type"] == "LINTR":
+                lintr_columns.update(columns)
+                continue
+            if block["type"] != "DISCRETE":
+                raise ValueError('The ' + block["type"] + ' block ' + name + ' can not be sampled!')
+            cases, probabilities = block.realizations()
+            blocks[0].append(np.array([columns[key] for key in block.elements], dtype=np.int64))
+            blocks[1].append(cases)
+            blocks[2].append(_shifted_cdf(probabilities, len(blocks[0]) - 1))
+        self.blocks = self._concatenate(blocks)
+        self.lintr = None
+        if lintr_columns:
+            self._compile_lintr(smps, lintr_columns)
+    
+    # LINTR elements are sampled by drawing their random variables, grouped by distribution
+    # type as for INDEP, and mapping them through the compiled LintrTransform
+    def _compile_lintr(self, smps, columns):
+        import numpy as np
+        self.lintr = smps.lintr_transform()
+        self.lintr_columns = np.array([columns[key] for key in self.lintr.elements], dtype=np.int64)
+        variables, constants = {}, []
+        for k, (period, block, name) in enumerate(self.lintr.variables):
+            variable = smps.blocks[period][block][name]
+            if variable["type"] == LINTR_CONSTANT:
+                constants.append(k)
+            elif variable["type"] in CONTINUOUS_DISTRIBUTIONS:
+                group = variables.setdefault(variable["type"], ([], [], []))
+                group[0].append(k)
+                group[1].append(variable["parameters"][0])
+                group[2].append(variable["parameters"][1])
+            else:
+                raise ValueError('The ' + variable["type"] + ' random variable ' + name + ' can not be sampled!')
+        self.lintr_variables = dict((_type, (np.array(indices, dtype=np.int64), np.array(first), np.array(second)))
+                                    for _type, (indices, first, second) in variables.items())
+        self.lintr_constants = np.array(constants, dtype=np.int64)
+    
+    # (columns, values, cdf, first position of every table)
+    @staticmethod
+    def _concatenate(tables):
+        import numpy as np
+        columns, values, cdfs = tables
+        if not columns:
+            return None
+        starts = np.cumsum([0] + [len(cdf) for cdf in cdfs])
+        return columns, values, np.concatenate(cdfs), starts
+    
+    # positions of the drawn entries in the concatenated tables
+    @staticmethod
+    def _choose(rng, n, tables):
+        import numpy as np
+        _, _, cdf, starts = tables
+        count = len(starts) - 1
+        u = rng.random((n, count)) + np.arange(count)
+        # rounding may push u to k + 1
+        return np.minimum(np.searchsorted(cdf, u, side="right"), starts[1:] - 1)
+    
+    def draw(self, rng, n):
+        import numpy as np
+        values = np.empty((n, len(self.elements)))
+        for _type, (columns, first, second) in self.continuous.items():
+            values[:, columns] = _draw(rng, _type, first, second, (n, len(columns)))
+        if self.tables is not None:
+            columns, tables, _, _ = self.tables
+            values[:, columns] = np.concatenate(tables)[self._choose(rng, n, self.tables)]
+        if self.blocks is not None:
+            columns, cases, _, starts = self.blocks
+            chosen = self._choose(rng, n, self.blocks) - starts[:-1]
+            for k, block_columns in enumerate(columns):
+                values[:, block_columns] = cases[k][chosen[:, k]]
+        if self.lintr is not None:
+            variables = np.empty((n, len(self.lintr.variables)))
+            for _type, (indices, first, second) in self.lintr_variables.items():
+                variables[:, indices] = _draw(rng, _type, first, second, (n, len(indices)))
+            variables[:, self.lintr_constants] = 1.0
+            values[:, self.lintr_columns] = self.lintr.realize(variables)
+        return values
 
+# The Cartesian product of independent discrete factors, each given by its elements, a
+# (realizations x elements) array of values and the realization probabilities. Scenario k is
+# the k-th combination in mixed radix order, the last factor varying fastest, and is computed
+# from its digits on access, so the product is never built as a whole. Slices are products
+# restricted to a range of scenarios and can be handed to other processes. Indices are Python
+# ints, count is the number of scenarios also where it is too large for len().
+class _ScenarioProduct:
+    
+    def __init__(self, factors, start=0, stop=None):
+        self.factors = factors
+        self.elements = [key for keys, _, _ in factors for key in keys]
+        self.strides = []
+        count = 1
+        for _, _, probabilities in reversed(factors):
+            self.strides.append(count)
+            count *= len(probabilities)
+        self.strides.reverse()
+        self.start = start
+        self.stop = count if stop is None else stop
+        self.count = self.stop - self.start
+    
+    # Values and probabilities of the scenarios lo, ..., hi - 1 of the full product. lo is split
+    # into digits as a Python int, so only the offsets within the batch are int64.
+    def _batch(self, lo, hi):
+        import numpy as np
+        offset = np.arange(hi - lo, dtype=np.int64)
+        columns, probs = [np.zeros((hi - lo, 0))], np.ones(hi - lo)
+        for (_, cases, probabilities), stride in zip(self.factors, self.strides):
+            quotient, remainder = divmod(lo, stride)
+            if stride > hi - lo:
+                # the digit moves on at most once within the batch
+                carry = (offset >= min(stride - remainder, hi - lo)).astype(np.int64)
+            else:
+                carry = (remainder + offset) // stride
+            digit = (quotient % len(probabilities) + carry) % len(probabilities)
+            columns.append(cases[digit])
+            probs *= probabilities[digit]
+        return np.hstack(columns), probs
+    
+    # yields the values and probabilities of the scenarios in batches of batch_size
+    def batches(self, batch_size):
+        for lo in range(self.start, self.stop, batch_size):
+            yield self._batch(lo, min(lo + batch_size, self.stop))
+    
+    def __len__(self):
+        if self.count > sys.maxsize:
+            raise OverflowError('The ' + str(self.count) + ' scenarios are too many for len(), use the count attribute!')
+        return self.count
+    
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            start, stop, step = k.indices(self.count)
+            if step != 1:
+                raise ValueError("Only contiguous slices of the scenarios are supported!")
+            return _ScenarioProduct(self.factors, self.start + start, self.start + max(start, stop))
+        k = operator.index(k)
+        if k < 0:
+            k += self.count
+        if not 0 <= k < self.count:
+            raise IndexError("scenario index out of range")
+        values, probs = self._batch(self.start + k, self.start + k + 1)
+        return values[0], probs[0]
+    
+    def __iter__(self):
+        for values, probs in self.batches(1 << 12):
+            yield from zip(values, probs)
+
+# The LINTR blocks of an SMPS instance as one linear map. Element k (a (col, row) key) takes the
+# value base[k] + (matrix @ u)[k] for values u of the random variables, which are given as
+# (period, block, name) triples. matrix is a scipy.sparse CSR matrix.
+class LintrTransform(namedtuple("LintrTransform", ["matrix", "base", "elements", "variables"])):
+    
+    __slots__ = ()
+    
+    # realizations of the elements for a (samples x variables) array of random variable values
+    def realize(self, values):
+        return self.base + (self.matrix @ values.T).T
 
+# keys of a LINTR block which are not random variables
+LINTR_BLOCK_FIELDS = ("type", "basecase", "elements")
+# a CONSTANT random variable is fixed to 1
+LINTR_CONSTANT = "CONSTANT"
+
+# The extensive form of a two-stage problem, see SMPS.deterministic_equivalent. row_origin and
+# col_origin hold the core row and column index of every row and column of the matrix.
+DeterministicEquivalent = namedtuple("DeterministicEquivalent", ["matrix", "objective", "rhs", "row_types", "lower", "upper",
+                                                                 "types", "probabilities", "row_origin", "col_origin"])
+
+# The scenarios of a SCENARIOS section. A scenario only stores its parent (-1 for ROOT), the
+# id of the period it branches off in, its probability and the (position, value) pairs of the
+# elements it changes w.r.t. its parent; elements are (column, row) pairs as in the blocks.
+class _Scenarios(Mapping):
+    
+    def __init__(self, periods):
+        self.periods = periods
+        self.names = []
+        self.index = {}
+        self.parents = array("q")
+        self.period_ids = array("q")
+        self.probs = array("d")
+        self.elements = []
+        self.positions = {}
+        # changes of scenario k are changed[ptr[k]:ptr[k+1]], values[ptr[k]:ptr[k+1]]
+        self.ptr = array("q", [0])
+        self.changed = array("q")
+        self.values = array("d")
+    
+    def scenario_index(self, name):
+        try:
+            return self.index[name]
+        except KeyError:
+            raise ValueError('The scenario ' + str(name) + ' does not exist!') from None
+    
+    def add_scenario(self, name, parent, probability, period):
+        if name in self.index:
+            raise ValueError('The scenario ' + name + ' already exists!')
+        self.parents.append(-1 if parent in (SCENARIO_ROOT, "'ROOT'") else self.scenario_index(parent))
+        self.period_ids.append(period)
+        self.probs.append(probability)
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.ptr.append(len(self.changed))
+    
+    # changes an element in the scenario added last
+    def set_value(self, key, value):
+        position = self.positions.get(key)
+        if position is None:
+            position = self.positions[key] = len(self.elements)
+            self.elements.append(key)
+        self.changed.append(position)
+        self.values.append(value)
+        self.ptr[-1] = len(self.changed)
+    
+    def _changes(self, k):
+        elements = self.elements
+        start, end = self.ptr[k], self.ptr[k + 1]
+        return dict((elements[i], value) for i, value in zip(self.changed[start:end], self.values[start:end]))
+    
+    # the changes of a scenario w.r.t. its parent
+    def changes(self, name):
+        return self._changes(self.scenario_index(name))
+    
+    # names of the scenarios from the one branching off ROOT down to name
+    def path(self, name):
+        path = []
+        k = self.scenario_index(name)
+        while k >= 0:
+            path.append(k)
+            k = self.parents[k]
+        return [self.names[k] for k in reversed(path)]
+    
+    # all changes w.r.t. the core problem, later scenarios on the path overriding earlier ones
+    def realization(self, name):
+        changes = {}
+        for ancestor in self.path(name):
+            changes.update(self.changes(ancestor))
+        return changes
+    
+    def __getitem__(self, name):
+        k = self.index.get(name)
+        if k is None:
+            raise KeyError(name)
+        parent = self.parents[k]
+        return {"parent": SCENARIO_ROOT if parent < 0 else self.names[parent], "period": self.periods[self.period_ids[k]],
+                "probability": self.probs[k], "changes": self._changes(k)}
+    
+    def __contains__(self, name):
+        return name in self.index
+    
+    def __iter__(self):
+        return iter(self.names)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def __repr__(self):
+        return repr(dict((name, self[name]) for name in self.names))
 
 class SMPS:
     
@@ -51,11 +463,18 @@ class SMPS:
         self.rows = self.mps.constraint_names()
         self.cols = self.mps.variable_names()
         
-        self.row_periods = {}
-        self.col_periods = {}
+        # period ids per row and column, -1 if no period was assigned
+        self.periods = []
+        self._period_index = {}
+        self._row_period = array("q", [-1]) * len(self.rows)
+        self._col_period = array("q", [-1]) * len(self.cols)
+        self.implicit = False
         
         self.distributions = {}
         self.blocks = {}
+        self.scenarios = _Scenarios(self.periods)
+        # ParseProfile of the read_smps call, if one was given
+        self.profile = None
         
         self.curr_block = None
         self.curr_block_period = None
@@ -69,6 +488,13 @@ class SMPS:
     
     
     # TIME RELATED FUNCTIONS
+    def _period(self, name):
+        k = self._period_index.get(name)
+        if k is None:
+            k = self._period_index[name] = len(self.periods)
+            self.periods.append(name)
+        return k
+    
     def start_implicit(self):
         self.last_row_period = None
         self.last_row = -1
@@ -82,37 +508,55 @@ class SMPS:
             self._add_row_period_implicit(None, len(self.rows))
 
     def get_periods(self):
-        return list(self.periods.keys())
+        return list(self.periods)
     
+    # in IMPLICIT mode every period owns the rows and columns from its first one up to the next period's
     def _add_row_period_implicit(self, period, r):
-        if self.last_row_period:
-            if self.last_row_period in self.row_periods:
-                self.row_periods[self.last_row_period].extend(self.rows[(self.last_row):r])
-            else:
-                self.row_periods[self.last_row_period] = copy.deepcopy(self.rows[(self.last_row):r])
-        self.last_row_period = period
+        if self.last_row_period is not None and r > self.last_row:
+            self._row_period[self.last_row:r] = array("q", [self.last_row_period]) * (r - self.last_row)
+        self.last_row_period = None if period is None else self._period(period)
         self.last_row = r
         
     def _add_col_period_implicit(self, period, c):
-        if self.last_col_period:
-            if self.last_col_period in self.col_periods:
-                self.col_periods[self.last_col_period].extend(self.cols[(self.last_col):c])
-            else:
-                self.col_periods[self.last_col_period] = copy.deepcopy(self.cols[(self.last_col):c])
-        self.last_col_period = period
+        if self.last_col_period is not None and c > self.last_col:
+            self._col_period[self.last_col:c] = array("q", [self.last_col_period]) * (c - self.last_col)
+        self.last_col_period = None if period is None else self._period(period)
         self.last_col = c
     
     def _add_row_period_explicit(self, period, row):
-        if period in self.row_periods:
-            self.row_periods[period].append(row)
-        else:
-            self.row_periods[period] = [row]
+        if row in self.mps._obj_index:
+            self._period(period)
+            return
+        self._row_period[self.mps.row_index(row)] = self._period(period)
         
     def _add_col_period_explicit(self, period, col):
-        if period in self.col_periods:
-            self.col_periods[period].append(col)
-        else:
-            self.col_periods[period] = [col]
+        self._col_period[self.mps.col_index(col)] = self._period(period)
+    
+    def _members(self, ids, names):
+        members = dict((period, []) for period in self.periods)
+        periods = self.periods
+        for name, k in zip(names, ids):
+            if k >= 0:
+                members[periods[k]].append(name)
+        return dict((period, names) for period, names in members.items() if names)
+    
+    # period name -> list of the rows (columns) belonging to it, derived from the period ids
+    @property
+    def row_periods(self):
+        return self._members(self._row_period, self.rows)
+    
+    @property
+    def col_periods(self):
+        return self._members(self._col_period, self.cols)
+    
+    # period ids (indices into get_periods()) of all rows and columns as numpy arrays
+    def row_period_ids(self):
+        import numpy as np
+        return np.array(self._row_period, dtype=np.int64)
+    
+    def col_period_ids(self):
+        import numpy as np
+        return np.array(self._col_period, dtype=np.int64)
     
     # STOCH RELATED FUNCTIONS
     def _add_discrete_distrib(self, period, col, row, value, probability):
@@ -146,48 +590,53 @@ class SMPS:
         self.curr_block = block
         if block not in self.blocks[period]:
             if _type == "DISCRETE":
-                self.blocks[period][block] = {"type": _type, "probabilities": {}}
+                self.blocks[period][block] = _DiscreteBlock()
+                self.curr_elements = self.blocks[period][block].elements
             else:
                 self.blocks[period][block] = {"type": _type}
+                self.curr_elements = []
+                if _type == "LINTR":
+                    self.blocks[period][block]["basecase"] = []
             self.new_block = True
-            self.curr_elements = []
-            self.curr_basecase = []
         else:
             self.new_block = False
             self.curr_elements = self.blocks[period][block]["elements"]
-            self.curr_basecase = copy.copy(self.blocks[period][block]["basecase"])
         self.curr_probability = probability
         
     
     def add_discrete_block_distrib(self, col, row, value):
         if self.new_block:
-            self.curr_elements.append(tuple([col, row]))
-            self.curr_basecase.append(value)
+            self.blocks[self.curr_block_period][self.curr_block].add_element(tuple([col, row]), value)
         else:
-            self.curr_basecase[self.curr_elements.index(tuple([col, row]))] = value
+            self.blocks[self.curr_block_period][self.curr_block].set_value(tuple([col, row]), value)
             
     def add_sub_block_distrib(self, col, row):
         if self.curr_block:
             self.curr_elements.append(tuple([col, row]))
     
+    # an element of a LINTR block with the value it takes for all random variables being 0
+    def add_lintr_element(self, col, row, value):
+        if self.curr_block:
+            self.curr_elements.append(tuple([col, row]))
+            self.blocks[self.curr_block_period][self.curr_block]["basecase"].append(value)
+    
     def detach_block(self):
         if not self.curr_block:
             return
+        block = self.blocks[self.curr_block_period][self.curr_block]
         if self.new_block:
-            self.blocks[self.curr_block_period][self.curr_block]["elements"] = self.curr_elements
+            if block["type"] != "DISCRETE":
+                block["elements"] = self.curr_elements
+            distributions = self.distributions.setdefault(self.curr_block_period, {})
             for t in self.curr_elements:
-                self.distributions[self.curr_block_period][t] = {"type": "BLOCK", "block": self.curr_block}
-        if self.blocks[self.curr_block_period][self.curr_block]["type"] == "DISCRETE":
-            if self.new_block:
-                self.blocks[self.curr_block_period][self.curr_block]["basecase"] = self.curr_basecase
-            self.blocks[self.curr_block_period][self.curr_block]["probabilities"][tuple(self.curr_basecase)] = self.curr_probability
+                distributions[t] = {"type": "BLOCK", "block": self.curr_block}
+        if block["type"] == "DISCRETE":
+            block.close_realization(self.curr_probability)
         
         self.curr_block = None
         self.curr_block_period = None
-        self.curr_basecase = None
         self.curr_probability = None
         self.curr_elements = None
-        self.curr_basecase = None
 
     def attach_lintr(self, period, block, lintr, distrib, parameters):
         self.curr_lintr_name = lintr
@@ -210,6 +659,289 @@ class SMPS:
         self.curr_lintr_name = None
         self.curr_lintr = None
         
+    def add_scenario(self, name, parent, probability, period):
+        self.scenarios.add_scenario(name, parent, probability, self._period(period))
+    
+    def set_scenario_value(self, col, row, value):
+        if not self.scenarios:
+            raise ValueError("A scenario value was given before the first SC line!")
+        self.scenarios.set_value(tuple([col, row]), value)
+    
+    # Compiles all LINTR blocks into a LintrTransform, so a batch of random variable values is
+    # turned into realizations of all LINTR elements by a single sparse matrix product.
+    def lintr_transform(self):
+        import numpy as np
+        from scipy import sparse
+        elements, base, variables = [], array("d"), []
+        rows, cols, vals = array("q"), array("q"), array("d")
+        for period, blocks in self.blocks.items():
+            for name, block in blocks.items():
+                if block["type"] != "LINTR":
+                    continue
+                positions = dict((key, len(elements) + k) for k, key in enumerate(block["elements"]))
+                elements.extend(block["elements"])
+                base.extend(block["basecase"])
+                for variable, transformation in block.items():
+                    if variable in LINTR_BLOCK_FIELDS:
+                        continue
+                    for key, coefficient in transformation["coefficients"].items():
+                        if key not in positions:
+                            raise ValueError("The element " + str(key) + " is not part of the block!")
+                        rows.append(positions[key])
+                        cols.append(len(variables))
+                        vals.append(coefficient)
+                    variables.append((period, name, variable))
+        matrix = sparse.csr_matrix((np.array(vals, dtype=np.float64), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+                                   shape=(len(elements), len(variables)))
+        return LintrTransform(matrix, np.array(base, dtype=np.float64), elements, variables)
+    
+    # SAMPLING
+    # the (col, row) keys of the random elements in the column order of sample
+    def random_elements(self):
+        return list(_Sampler(self).elements)
+    
+    # Draws n scenarios of the INDEP and BLOCKS distributions as an (n x random elements) numpy
+    # array and returns it together with the (col, row) keys of its columns. Parallel workers
+    # get reproducible, independent samples by passing the same seed and their own stream.
+    def sample(self, n, seed=None, stream=None):
+        sampler = _Sampler(self)
+        return sampler.draw(_generator(seed, stream), n), sampler.elements
+    
+    # draws n scenarios like sample in arrays of at most chunk_size rows
+    def sample_chunks(self, n, chunk_size, seed=None, stream=None):
+        sampler = _Sampler(self)
+        rng = _generator(seed, stream)
+        for start in range(0, n, chunk_size):
+            yield sampler.draw(rng, min(chunk_size, n - start))
+    
+    # SCENARIO ENUMERATION
+    # the independent factors of the discrete distributions, each given by its elements, a
+    # (realizations x elements) array of values and the probabilities of the realizations
+    def _discrete_factors(self):
+        import numpy as np
+        factors = []
+        for period, distributions in self.distributions.items():
+            blocks = set()
+            for key, distribution in distributions.items():
+                if distribution["type"] == "DISCRETE":
+                    probabilities = distribution["probabilities"]
+                    factors.append(([key], np.array(list(probabilities), dtype=np.float64)[:, None],
+                                    np.array(list(probabilities.values()), dtype=np.float64)))
+                elif distribution["type"] == "BLOCK":
+                    if distribution["block"] in blocks:
+                        continue
+                    blocks.add(distribution["block"])
+                    block = self.blocks[period][distribution["block"]]
+                    if block["type"] != "DISCRETE":
+                        raise ValueError('The ' + block["type"] + ' block ' + distribution["block"] + ' can not be enumerated!')
+                    cases, probabilities = block.realizations()
+                    factors.append((list(block.elements), cases, probabilities))
+                else:
+                    raise ValueError('The ' + distribution["type"] + ' distribution of ' + str(key) + ' can not be enumerated!')
+        return factors
+    
+    # The random elements, a (scenarios x elements) array of their values and the scenario
+    # probabilities. These are the scenarios of the SCENARIOS section if there is one and the
+    # product of the discrete distributions otherwise. Every SC line is a complete scenario
+    # with its own unconditional probability, its parent only names the scenario it takes the
+    # unchanged values from. NaN marks elements a scenario leaves at their core value.
+    def _scenario_values(self):
+        import numpy as np
+        scenarios = self.scenarios
+        if scenarios:
+            values = np.full((len(scenarios.names), len(scenarios.elements)), np.nan)
+            for k, name in enumerate(scenarios.names):
+                for key, value in scenarios.realization(name).items():
+                    values[k, scenarios.positions[key]] = value
+            return list(scenarios.elements), values, np.array(scenarios.probs, dtype=np.float64)
+        product = self.scenario_product()
+        values, probs = product._batch(product.start, product.stop)
+        return product.elements, values, probs
+    
+    # All combinations of the DISCRETE distributions and blocks as a lazy sequence of (values,
+    # probability) pairs, the values being ordered like the elements attribute of the sequence.
+    # Supports len (count for more than sys.maxsize scenarios), random access, contiguous slices
+    # and batches(batch_size).
+    def scenario_product(self):
+        return _ScenarioProduct(self._discrete_factors())
+    
+    # Builds the extensive form of a two-stage problem: the first stage rows and columns (those
+    # of the first period or without period) followed by one copy of the second stage rows and
+    # columns per scenario,
+    #     [ A            ]
+    #     [ T_1  W_1     ]
+    #     [ T_2      W_2 ]
+    # with the random elements set to their scenario values and the second stage objective
+    # scaled by the scenario probabilities. Needs numpy and scipy.
+    def deterministic_equivalent(self, objective=None):
+        import numpy as np
+        from scipy import sparse
+        mps = self.mps
+        if len(self.periods) > 2:
+            raise ValueError("The deterministic equivalent is only implemented for two-stage problems!")
+        elements, values, probs = self._scenario_values()
+        count = len(probs)
+        
+        second_rows = np.array(self._row_period, dtype=np.int64) > 0
+        second_cols = np.array(self._col_period, dtype=np.int64) > 0
+        rows1, rows2 = np.flatnonzero(~second_rows), np.flatnonzero(second_rows)
+        cols1, cols2 = np.flatnonzero(~second_cols), np.flatnonzero(second_cols)
+        m1, m2, n1, n2 = len(rows1), len(rows2), len(cols1), len(cols2)
+        # position of every core row and column within its stage
+        row_pos = np.empty(len(second_rows), dtype=np.int64)
+        row_pos[rows1], row_pos[rows2] = np.arange(m1), np.arange(m2)
+        col_pos = np.empty(len(second_cols), dtype=np.int64)
+        col_pos[cols1], col_pos[cols2] = np.arange(n1), np.arange(n2)
+        
+        objective = 0 if objective is None else mps.objective_index(objective)
+        rhs_elements, obj_elements, matrix_elements = [], [], []
+        for e, (col, row) in enumerate(elements):
+            if col in mps.rhs:
+                if row in mps._obj_index:
+                    raise ValueError("Random objective offsets are not supported!")
+                rhs_elements.append((e, mps.row_index(row)))
+            elif row in mps._obj_index:
+                if mps.objective_index(row) == objective:
+                    obj_elements.append((e, mps.col_index(col)))
+            else:
+                matrix_elements.append((e, mps.row_index(row), mps.col_index(col)))
+        if any(not second_rows[i] for _, i in rhs_elements) or any(not second_rows[i] for _, i, _ in matrix_elements):
+            raise ValueError("Random elements are only allowed in second stage rows!")
+        if any(not second_cols[j] for _, j in obj_elements):
+            raise ValueError("Random objective coefficients are only allowed for second stage columns!")
+        
+        # MATRIX
+        core = mps.to_csr().tocoo()
+        i, j, a = core.row.astype(np.int64), core.col.astype(np.int64), core.data
+        first = ~second_rows[i]
+        if np.any(second_cols[j[first]]):
+            raise ValueError("A first stage row contains second stage columns, the problem is not two-stage!")
+        i2, j2, a2 = i[~first], j[~first], a[~first]
+        # random entries missing in the core matrix are added with value 0
+        ncols = len(second_cols)
+        element_keys = np.array([r * ncols + c for _, r, c in matrix_elements], dtype=np.int64)
+        keys = i2 * ncols + j2
+        missing = np.setdiff1d(element_keys, keys)
+        i2, j2 = np.concatenate((i2, missing // ncols)), np.concatenate((j2, missing % ncols))
+        a2, keys = np.concatenate((a2, np.zeros(len(missing)))), np.concatenate((keys, missing))
+        order = np.argsort(keys, kind="stable")
+        positions = order[np.searchsorted(keys[order], element_keys)]
+        
+        block = np.tile(a2, (count, 1))
+        self._set_random(block, positions, values, [e for e, _, _ in matrix_elements])
+        scenario = np.repeat(np.arange(count), len(a2))
+        stage2 = np.tile(second_cols[j2], count)
+        rows = np.concatenate((row_pos[i[first]], m1 + scenario * m2 + np.tile(row_pos[i2], count)))
+        cols = np.concatenate((col_pos[j[first]], np.tile(col_pos[j2], count) + np.where(stage2, n1 + scenario * n2, 0)))
+        matrix = sparse.csr_matrix((np.concatenate((a[first], block.ravel())), (rows, cols)), shape=(m1 + count * m2, n1 + count * n2))
+        matrix.eliminate_zeros()
+        
+        # VECTORS
+        b = mps.rhs_vector()
+        b2 = np.tile(b[rows2], (count, 1))
+        self._set_random(b2, row_pos[[i for _, i in rhs_elements]], values, [e for e, _ in rhs_elements])
+        c = mps.objective_vector(mps.objective_name(objective))
+        c2 = np.tile(c[cols2], (count, 1))
+        self._set_random(c2, col_pos[[j for _, j in obj_elements]], values, [e for e, _ in obj_elements])
+        c2 *= probs[:, None]
+        lower, upper, types = mps.bound_vectors()
+        row_types = np.array([mps.constraints[name]["type"] for name in mps._row_names])
+        
+        def stages(vector, rows):
+            first, second = (rows1, rows2) if rows else (cols1, cols2)
+            return np.concatenate((vector[first], np.tile(vector[second], count)))
+        
+        return DeterministicEquivalent(matrix, np.concatenate((c[cols1], c2.ravel())), np.concatenate((b[rows1], b2.ravel())),
+                                       stages(row_types, True), stages(lower, False), stages(upper, False), stages(types, False),
+                                       probs, stages(np.arange(len(second_rows)), True), stages(np.arange(len(second_cols)), False))
+    
+    # sets target[:, positions] to the scenario values of the given elements where these are not NaN
+    @staticmethod
+    def _set_random(target, positions, values, elements):
+        import numpy as np
+        if len(elements) == 0:
+            return
+        random = values[:, elements]
+        positions = np.asarray(positions, dtype=np.int64)
+        target[:, positions] = np.where(np.isnan(random), target[:, positions], random)
+    
+    # CACHE SERIALIZATION
+    # the core is stored like an MPS cache, DISCRETE blocks and the scenarios in their flat
+    # arrays and all other distributions and blocks in the header, with (col, row) keys and
+    # the value -> probability dicts of DISCRETE distributions written as lists
+    def _dump(self):
+        header, arrays = self.mps._dump()
+        header["periods"] = self.periods
+        arrays["row_period"] = self._row_period
+        arrays["col_period"] = self._col_period
+        header["distributions"] = [[period, col, row, dict(distribution, probabilities=list(distribution["probabilities"].items()))
+                                    if "probabilities" in distribution else distribution]
+                                   for period, distributions in self.distributions.items()
+                                   for (col, row), distribution in distributions.items()]
+        header["blocks"] = []
+        for period, blocks in self.blocks.items():
+            for name, block in blocks.items():
+                if isinstance(block, _DiscreteBlock):
+                    k = len(header["blocks"])
+                    header["blocks"].append([period, name, {"type": "DISCRETE"}])
+                    arrays["blocks.%d.cols" % k] = _join_names([col for col, _ in block.elements])
+                    arrays["blocks.%d.rows" % k] = _join_names([row for _, row in block.elements])
+                    for field in ("basecase", "ptr", "changed", "values", "probs"):
+                        arrays["blocks.%d.%s" % (k, field)] = getattr(block, field)
+                    continue
+                entry = {}
+                for key, value in block.items():
+                    if key == "elements":
+                        value = [list(element) for element in value]
+                    elif isinstance(value, dict):
+                        # a random variable of a LINTR block
+                        value = dict(value, coefficients=[[col, row, coefficient] for (col, row), coefficient in value["coefficients"].items()])
+                    entry[key] = value
+                header["blocks"].append([period, name, entry])
+        scenarios = self.scenarios
+        arrays["scenarios.names"] = _join_names(scenarios.names)
+        arrays["scenarios.cols"] = _join_names([col for col, _ in scenarios.elements])
+        arrays["scenarios.rows"] = _join_names([row for _, row in scenarios.elements])
+        for field in ("parents", "period_ids", "probs", "ptr", "changed", "values"):
+            arrays["scenarios." + field] = getattr(scenarios, field)
+        return header, arrays
+    
+    @staticmethod
+    def _restore(header, arrays):
+        smps = SMPS(MPS._restore(header, arrays))
+        for period in header["periods"]:
+            smps._period(period)
+        smps._row_period = arrays["row_period"]
+        smps._col_period = arrays["col_period"]
+        for period, col, row, distribution in header["distributions"]:
+            if "probabilities" in distribution:
+                distribution["probabilities"] = dict((value, probability) for value, probability in distribution["probabilities"])
+            smps.distributions.setdefault(period, {})[(col, row)] = distribution
+        for k, (period, name, entry) in enumerate(header["blocks"]):
+            if entry["type"] == "DISCRETE":
+                block = _DiscreteBlock()
+                block.elements = list(zip(_split_names(arrays["blocks.%d.cols" % k]), _split_names(arrays["blocks.%d.rows" % k])))
+                block.positions = dict(zip(block.elements, range(len(block.elements))))
+                for field in ("basecase", "ptr", "changed", "values", "probs"):
+                    setattr(block, field, arrays["blocks.%d.%s" % (k, field)])
+            else:
+                block = {}
+                for key, value in entry.items():
+                    if key == "elements":
+                        value = [tuple(element) for element in value]
+                    elif isinstance(value, dict):
+                        value["coefficients"] = dict(((col, row), coefficient) for col, row, coefficient in value["coefficients"])
+                    block[key] = value
+            smps.blocks.setdefault(period, {})[name] = block
+        scenarios = smps.scenarios
+        scenarios.names = _split_names(arrays["scenarios.names"])
+        scenarios.index = dict(zip(scenarios.names, range(len(scenarios.names))))
+        scenarios.elements = list(zip(_split_names(arrays["scenarios.cols"]), _split_names(arrays["scenarios.rows"])))
+        scenarios.positions = dict(zip(scenarios.elements, range(len(scenarios.elements))))
+        for field in ("parents", "period_ids", "probs", "ptr", "changed", "values"):
+            setattr(scenarios, field, arrays["scenarios." + field])
+        return smps
+    
     # used to produce dict
     def __iter__(self):
         for field in self.mps:
@@ -218,30 +950,16 @@ class SMPS:
         yield ("row_periods", self.row_periods)
         yield ("col_periods", self.col_periods)
         yield ("distributions", self.distributions)
-        yield ("blocks", self.blocks)
+        yield ("blocks", dict((period, dict((name, dict(block)) for name, block in blocks.items())) for period, blocks in self.blocks.items()))
+        yield ("scenarios", dict((name, self.scenarios[name]) for name in self.scenarios))
 
-def _read_tim(smps, path):
+def _read_tim(smps, path, format="free", profile=None, cancel=None):
     mps = smps.mps
     
     mode = -1
     
-    explicit = False
-    rows = smps.rows
-    cols = smps.cols
-    
-    with open(path, "r") as reader:
-        for line in reader:
-            if line.startswith("*"):
-                continue
-
-            line = re.split(" |\t", line)
-            line = [x.strip() for x in line]
-            line = list(filter(None, line))
-            
-            if len(line) == 0:
-                continue
-            if line[0] == "*":
-                continue
+    with _open(path, cancel=cancel) as reader:
+        for line in _tokenize(reader, format=format, profile=profile, keywords=TIME_FILE_SECTIONS):
             if line[0] == "ENDATA":
                 break
             if line[0] == "TIME":
@@ -251,7 +969,6 @@ def _read_tim(smps, path):
             elif line[0] == TIME_FILE_PERIODS_MODE:
                 if len(line) > 1 and line[1] == "EXPLICIT":
                     mode = TIME_MODE[TIME_FILE_PERIODS_MODE_EXPLICIT]
-                    explicit = True
                 else: # in case it is blank, IMPLICIT or anything else set it to implicit.
                     mode = TIME_MODE[TIME_FILE_PERIODS_MODE_IMPLICIT]
                     smps.start_implicit()
@@ -266,40 +983,33 @@ def _read_tim(smps, path):
                 
                 
             elif mode == TIME_MODE[TIME_FILE_PERIODS_MODE_IMPLICIT]:
-                smps._add_col_period_implicit(line[2], cols.index(line[0]))
-                smps._add_row_period_implicit(line[2], rows.index(line[1]))
+                smps._add_col_period_implicit(line[2], mps.col_index(line[0]))
+                smps._add_row_period_implicit(line[2], mps.row_index(line[1]))
+                
+                
+            elif mode == TIME_MODE[TIME_FILE_PERIODS_MODE_EXPLICIT]:
+                smps._period(line[0])
                 
                 
             elif mode == TIME_MODE[TIME_FILE_ROWS_MODE]:
                 smps._add_row_period_explicit(line[1], line[0])
                 
                 
-            elif mode == TIME_FILE_COLS_MODE:
+            elif mode == TIME_MODE[TIME_FILE_COLS_MODE]:
                 smps._add_col_period_explicit(line[1], line[0])
                 
                 
     smps.finalize_implicit()
 
 
-def _read_sto(smps, path):
+def _read_sto(smps, path, format="free", profile=None, cancel=None):
     mps = smps.mps
     
     mode = -1
     distribution = None
     
-    with open(path, "r") as reader:
-        for line in reader:
-            if line.startswith("*"):
-                continue
-
-            line = re.split(" |\t", line)
-            line = [x.strip() for x in line]
-            line = list(filter(None, line))
-            
-            if len(line) == 0:
-                continue
-            if line[0] == "*":
-                continue
+    with _open(path, cancel=cancel) as reader:
+        for line in _tokenize(reader, format=format, profile=profile, keywords=STOCH_FILE_SECTIONS):
             if line[0] == "ENDATA":
                 break
             if line[0] == "STOCH":
@@ -331,7 +1041,19 @@ def _read_sto(smps, path):
                 smps.detach_block()
             
             elif line[0] == STOCH_FILE_SCENARIOS_MODE:
-                raise ValueError("SCENARIOS are currently not implemented!")
+                if len(line) > 1 and line[1] != "DISCRETE":
+                    raise ValueError("Only DISCRETE SCENARIOS are supported!")
+                mode = STOCH_MODE[STOCH_FILE_SCENARIOS_DISCRETE_MODE]
+                
+                smps.detach_lintr()
+                smps.detach_block()
+                
+            elif mode == STOCH_MODE[STOCH_FILE_SCENARIOS_DISCRETE_MODE]:
+                if line[0] == STOCH_FILE_SCENARIO_SC_MODE:
+                    smps.add_scenario(line[1], line[2], float(line[3]), line[4])
+                else:
+                    for row, value in zip(line[1::2], line[2::2]):
+                        smps.set_scenario_value(line[0], row, float(value))
                 
                 
             elif mode == STOCH_MODE[STOCH_FILE_INDEP_DISCRETE_MODE]:
@@ -379,7 +1101,7 @@ def _read_sto(smps, path):
                         smps.attach_lintr(period, block, line[1], line[2], {})
                 else:
                     if smps.curr_block:
-                        smps.add_sub_block_distrib(line[0], line[1])
+                        smps.add_lintr_element(line[0], line[1], float(line[2]) if len(line) > 2 else 0.0)
                     elif smps.curr_lintr_block:
                         smps.add_to_lintr(line[0], line[1], float(line[2]))
             
@@ -387,9 +1109,61 @@ def _read_sto(smps, path):
         smps.detach_lintr()
             
 
-def read_smps(path):
-    smps = SMPS(read_mps(path + ".cor"))
-    _read_tim(smps, path + ".tim")
-    _read_sto(smps, path + ".sto")
+# each of the three files may also be stored compressed, e.g. as path + ".sto.gz";
+# keyword arguments are passed on to read_mps for the core file. Unless given, the format
+# is detected from the core file and used for the time and stochastic file as well.
+def read_smps(path, **kwargs):
+    paths = [_find_file(path + suffix) for suffix in (".cor", ".tim", ".sto")]
+    profile = kwargs.get("profile")
+    if kwargs.get("cache_dir") is not None:
+        options = dict(kwargs, cache_dir=None)
+        if profile is None:
+            return _cached(kwargs["cache_dir"], paths, options, lambda: read_smps(path, **options), SMPS._dump, SMPS._restore)
+        profile._begin(path)
+        try:
+            profile._enter("CACHE")
+            smps = _cached(kwargs["cache_dir"], paths, options, lambda: read_smps(path, **options), SMPS._dump, SMPS._restore)
+        finally:
+            profile._end()
+        smps.profile = profile
+        return smps
+    
+    format = kwargs.get("format") or _file_format(paths[0])
+    cancel = kwargs.get("cancel")
+    if profile is None:
+        smps, sources = _read_core(paths, format, kwargs)
+        _read_tim(smps, sources[0], format, cancel=cancel)
+        _read_sto(smps, sources[1], format, cancel=cancel)
+        return smps
+    
+    # tracemalloc keeps running across the three files
+    profile._begin(path)
+    try:
+        smps, sources = _read_core(paths, format, kwargs)
+        for read, name, source in zip((_read_tim, _read_sto), paths[1:], sources):
+            profile._begin(name)
+            try:
+                read(smps, source, format, profile, cancel)
+            finally:
+                profile._end()
+    finally:
+        profile._end()
+    smps.profile = profile
     return smps
+
+def _read_text(path):
+    with _open(path) as reader:
+        return reader.read()
+
+# Parses the core file and returns the SMPS instance together with the time and stochastic
+# file. With prefetch=True those two are read into memory by two threads while the core file
+# is parsed, so the I/O and decompression of the three files overlap.
+def _read_core(paths, format, kwargs):
+    if not kwargs.get("prefetch", False):
+        return SMPS(read_mps(paths[0], **dict(kwargs, format=format))), paths[1:]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(2) as pool:
+        texts = [pool.submit(_read_text, source) for source in paths[1:]]
+        smps = SMPS(read_mps(paths[0], **dict(kwargs, format=format)))
+        return smps, [io.StringIO(text.result()) for text in texts]
     
\ No newline at end of file
@@ -1,11 +1,22 @@
 import unittest
 import math
+import os
+import bz2
+import gzip
+import shutil
+import tempfile
+import subprocess
+import asyncio
+import threading
+import warnings
+from array import array
 
 import os,sys,inspect
 current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 parent_dir = os.path.dirname(current_dir)
-sys.path.insert(0, parent_dir) 
-from mps_loader import read_mps
+sys.path.insert(0, os.path.dirname(parent_dir))
+from pysmps import mps_loader, smps_loader
+from pysmps import read_mps, read_smps, write_mps, read_many, aread_mps, aread_smps
 
 class TestMPSReader(unittest.TestCase):
         
@@ -190,10 +201,564 @@ class TestMPSReader(unittest.TestCase):
             'rhs_names': ['RHS1', 'RHS2']
         })
         
+    def test_sparse_case01(self):
+        dense = read_mps(current_dir + "/case01")
+        sparse = read_mps(current_dir + "/case01", sparse=True)
+        self.assertTrue(sparse.is_sparse())
+        self.assertEqual(sparse.get_constraints()["leq"], {"type": "L"})
+        self.assertEqual(sparse.to_csr().shape, (3, 9))
+        self.assertEqual((dense.to_csr() != sparse.to_csc()).nnz, 0)
+        self.assertEqual(sparse.to_csr()[1, 1], -10.0)
+        self.assertEqual(list(sparse.objective_vector()), [1.5, 2.5, -3.5, -4.5, 5.5, 9.0, 9.5, -120.5, 120.5])
+        
+    def test_mmap_case01(self):
+        for sparse in [False, True]:
+            text = read_mps(current_dir + "/case01", sparse=sparse)
+            mapped = read_mps(current_dir + "/case01", sparse=sparse, mmap=True)
+            self.assertEqual(dict(text), dict(mapped))
+            self.assertEqual((text.to_csr() != mapped.to_csr()).nnz, 0)
+        
+    def test_compressed_case01(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(current_dir + "/case01", "rb") as reader, gzip.open(tmp + "/case01.mps.gz", "wb") as writer:
+                shutil.copyfileobj(reader, writer)
+            # detected from the magic bytes only
+            os.rename(tmp + "/case01.mps.gz", tmp + "/case01.mps")
+            self.assertEqual(dict(read_mps(tmp + "/case01.mps")), dict(read_mps(current_dir + "/case01")))
+            self.assertEqual(dict(read_mps(tmp + "/case01.mps", mmap=True)), dict(read_mps(current_dir + "/case01")))
+        
+    def test_bounds_groups_case04(self):
+        mps = read_mps(current_dir + "/case04")
+        self.assertEqual(mps.bnd_names(), ["BND1", "BND2"])
+        # groups only store what they change
+        self.assertEqual(mps.variables["BND2"].overrides, {"z": {"lower": 1.5, "upper": 1.5}})
+        self.assertEqual(mps.get_variables()["x"], {"type": "Continuous", "lower": 0.0, "upper": 4.0})
+        self.assertEqual(mps.get_variables()["y"]["lower"], -math.inf)
+        bnd2 = mps.attach_bnd("BND2")
+        self.assertEqual(bnd2["x"]["upper"], math.inf)
+        bnd2["x"]["upper"] = 7.0
+        self.assertEqual(mps.get_variables(materialize=True)["x"], {"type": "Continuous", "lower": 0.0, "upper": 7.0})
+        self.assertEqual(mps.variables["BND1"]["x"]["upper"], 4.0)
+        
+    def test_indices_case01(self):
+        mps = read_mps(current_dir + "/case01", sparse=True)
+        self.assertEqual(mps.row_index("geq"), 2)
+        self.assertEqual(mps.row_name(2), "geq")
+        self.assertEqual(mps.objective_index("obj"), 0)
+        self.assertEqual(mps.col_index("free"), 7)
+        self.assertEqual(mps.col_name(7), "free")
+        self.assertEqual(list(mps.col_indices(["int", "c_bnd"])), [5, 0])
+        self.assertEqual(mps.to_csr()[mps.row_index("geq"), mps.col_index("free")], 250.0)
+        self.assertRaises(ValueError, mps.row_index, "obj")
+        
+    def test_bound_vectors_case01(self):
+        mps = read_mps(current_dir + "/case01")
+        lower, upper, types = mps.bound_vectors()
+        self.assertEqual(list(lower), [-5.0, 5.0, -100.0, 0.0, -10.0, 5.0, 0.0, -math.inf, 20.5])
+        self.assertEqual(list(upper), [10.0, 100.0, -5.0, 10.0, math.inf, 10.0, 1.0, math.inf, 20.5])
+        self.assertEqual(list(types), [0, 0, 0, 0, 0, 1, 1, 0, 0])
+        self.assertEqual(mps._variables["int"], {"type": "Integer", "lower": 0.0, "upper": math.inf})
+        self.assertEqual(mps.get_variables()["int"]["upper"], 10.0)
+        
+    def test_rhs_groups_case04(self):
+        mps = read_mps(current_dir + "/case04")
+        self.assertEqual(mps.rhs["RHS2"].entries, {"lim2": 3.0})
+        self.assertEqual(mps.get_rhs(), {"lim1": 8.0, "lim2": 0, "bal": 0})
+        self.assertEqual(mps.get_offsets()["obj"], -2.5)
+        self.assertEqual(list(mps.rhs_vector()), [8.0, 0.0, 0.0])
+        self.assertEqual(list(mps.rhs_vector("RHS2")), [0.0, 3.0, 0.0])
+        self.assertEqual(dict(mps)["offsets"], {"RHS1": {"obj": -2.5}, "RHS2": {"obj": 0}})
+        
+    def test_parallel_case01(self):
+        chunk_size = mps_loader.PARALLEL_MIN_CHUNK_SIZE
+        mps_loader.PARALLEL_MIN_CHUNK_SIZE = 64
+        try:
+            for sparse in [False, True]:
+                serial = read_mps(current_dir + "/case01", sparse=sparse)
+                parallel = read_mps(current_dir + "/case01", sparse=sparse, workers=3)
+                self.assertEqual(dict(serial), dict(parallel))
+                self.assertEqual((serial.to_csr() != parallel.to_csr()).nnz, 0)
+                self.assertEqual(list(serial.objective_vector()), list(parallel.objective_vector()))
+        finally:
+            mps_loader.PARALLEL_MIN_CHUNK_SIZE = chunk_size
+        
+    def test_cache_case04(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(current_dir + "/case04", tmp + "/case04.mps")
+            for sparse in [False, True]:
+                parsed = read_mps(tmp + "/case04.mps", sparse=sparse, cache_dir=tmp + "/cache")
+                cached = read_mps(tmp + "/case04.mps", sparse=sparse, cache_dir=tmp + "/cache")
+                self.assertEqual(dict(parsed), dict(cached))
+                self.assertEqual((parsed.to_csr() != cached.to_csr()).nnz, 0)
+                self.assertEqual(cached.variables["BND2"].overrides, {"z": {"lower": 1.5, "upper": 1.5}})
+            self.assertEqual(len(os.listdir(tmp + "/cache")), 2)
+            # changed files are parsed again
+            with open(tmp + "/case04.mps", "r") as reader:
+                content = reader.read()
+            with open(tmp + "/case04.mps", "w") as writer:
+                writer.write(content.replace("FX BND2      z         1.5", "FX BND2      z         2.5"))
+            self.assertEqual(read_mps(tmp + "/case04.mps", cache_dir=tmp + "/cache").variables["BND2"]["z"]["upper"], 2.5)
+            # caches of other format versions are ignored
+            for name in os.listdir(tmp + "/cache"):
+                with open(tmp + "/cache/" + name, "r+b") as writer:
+                    writer.seek(len(b"PYSMPS-CACHE"))
+                    writer.write(b"\xff\xff\xff\xff")
+            self.assertEqual(read_mps(tmp + "/case04.mps", cache_dir=tmp + "/cache").variables["BND2"]["z"]["upper"], 2.5)
+            # concurrent writers of one cache file use temporary files of their own, failed ones remove theirs
+            path = tmp + "/cache/concurrent"
+            threads = [threading.Thread(target=mps_loader._write_cache, args=(path, {}, {"x": array("d", [k])})) for k in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(mps_loader._read_cache(path)[1]["x"]), 1)
+            class Broken:
+                typecode, itemsize = "d", 8
+                def __len__(self):
+                    return 1
+            with self.assertRaises(TypeError):
+                mps_loader._write_cache(path, {}, {"x": Broken()})
+            self.assertFalse([name for name in os.listdir(tmp + "/cache") if name.endswith(".tmp")])
+        
+    def test_iter_mps_case04(self):
+        records = list(mps_loader.iter_mps(current_dir + "/case04"))
+        self.assertEqual(records[0], mps_loader.NameRecord("test_case04"))
+        self.assertIn(mps_loader.RowRecord("L", "lim1"), records)
+        self.assertIn(mps_loader.ColumnRecord("x", "bal", 1.0), records)
+        self.assertIn(mps_loader.RhsRecord("RHS1", "obj", -2.5), records)
+        self.assertIn(mps_loader.RangeRecord("RNG", "lim2", 4.0), records)
+        self.assertIn(mps_loader.BoundRecord("MI", "BND1", "y", None), records)
+        self.assertEqual(len([r for r in records if isinstance(r, mps_loader.ColumnRecord)]), 8)
+        self.assertEqual(list(mps_loader.iter_mps(current_dir + "/case04", mmap=True)), records)
+        
+    def test_column_batches_case01(self):
+        # read_mps takes the COLUMNS lines in batches, which gives the model built record by record
+        batch_size = mps_loader.COLUMN_BATCH_SIZE
+        mps_loader.COLUMN_BATCH_SIZE = 16
+        try:
+            for sparse in [False, True]:
+                mps = mps_loader.MPS({"c_lower": 0.0, "c_upper": math.inf, "i_lower": 0.0, "i_upper": math.inf})
+                if sparse:
+                    mps._use_coo()
+                parser = mps_loader._MPSReader(mps, {"MI_upper": 0.0, "SC_lower": 1.0})
+                for record in mps_loader.iter_mps(current_dir + "/case01"):
+                    if not parser.feed(record):
+                        break
+                for mmap in [False, True]:
+                    batched = read_mps(current_dir + "/case01", sparse=sparse, mmap=mmap)
+                    self.assertEqual(dict(batched), dict(mps))
+                    self.assertEqual((batched.to_csr() != mps.to_csr()).nnz, 0)
+                    self.assertEqual(list(batched.bound_vectors()[2]), list(mps.bound_vectors()[2]))
+        finally:
+            mps_loader.COLUMN_BATCH_SIZE = batch_size
+        
+    def test_keyword_names(self):
+        # names starting with a section keyword are no section headers
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(tmp + "/keywords.mps", "w") as writer:
+                writer.write("NAME keywords\nROWS\n N  obj\n L  c\nCOLUMNS\n    x  obj  1.0\n    NAME.1  c  2.0\n"
+                             "    ROWS-2  obj  3.0  c  4.0\n    SOS(3)  c  5.0\nRHS\n    RHS  c  1.0\nENDATA\n")
+            columns = ["x", "NAME.1", "ROWS-2", "SOS(3)"]
+            for mmap in [False, True]:
+                mps = read_mps(tmp + "/keywords.mps", mmap=mmap)
+                self.assertEqual(mps.variable_names(), columns)
+                self.assertEqual(mps.constraints["c"]["coefficients"], {"NAME.1": 2.0, "ROWS-2": 4.0, "SOS(3)": 5.0})
+            self.assertEqual(list(mps_loader.iter_mps(tmp + "/keywords.mps", mmap=True)), list(mps_loader.iter_mps(tmp + "/keywords.mps")))
+        
+    def test_fixed_format_case05(self):
+        mps = read_mps(current_dir + "/case05")
+        self.assertEqual(mps.name, "TEST 05")
+        self.assertEqual(mps.constraint_names(), ["LIM 1", "LIM 2", "MY EQN"])
+        self.assertEqual(mps.variable_names(), ["X ONE", "Y TWO", "Z"])
+        self.assertEqual(mps.constraints["MY EQN"]["coefficients"], {"Y TWO": -1.0, "Z": 1.0})
+        self.assertEqual(mps.rhs["RHS 1"], {"LIM 1": 4.0, "LIM 2": 1.0, "MY EQN": 7.0})
+        self.assertEqual(mps.variables["BND 1"]["Y TWO"], {"type": "Integer", "lower": -1.0, "upper": 1.0})
+        self.assertEqual(dict(read_mps(current_dir + "/case05", format="fixed", mmap=True)), dict(mps))
+        # free format files are detected as such
+        self.assertEqual(mps_loader._file_format(current_dir + "/case04"), "free")
+        self.assertRaises(ValueError, read_mps, current_dir + "/case05", format="tabular")
+        
+    def test_late_fixed_format_line(self):
+        # the first name with a space comes after the lines _file_format looks at
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(tmp + "/late.mps", "w") as writer:
+                writer.write("NAME          LATE\nROWS\n N  COST\n L  LIM1\nCOLUMNS\n")
+                for name in ["C" + str(j) for j in range(40000)] + ["X ONE"]:
+                    writer.write("    %-8s  %-8s  %12s\n" % (name, "LIM1", "1.0"))
+                writer.write("RHS\n    RHS       LIM1               4.0\nENDATA\n")
+            self.assertIsNone(mps_loader._file_format(tmp + "/late.mps"))
+            self.assertEqual(mps_loader._file_format(tmp + "/late.mps", whole=True), "fixed")
+            # the file is read as free, which fails on the late line, and then again as fixed
+            for mmap in [False, True]:
+                with self.assertWarns(UserWarning):
+                    mps = read_mps(tmp + "/late.mps", mmap=mmap)
+                self.assertEqual(mps.variable_names()[-2:], ["C39999", "X ONE"])
+                self.assertEqual(mps.constraints["LIM1"]["coefficients"]["X ONE"], 1.0)
+        
+    def test_blank_set_names(self):
+        # only the RHS and BOUNDS lines without a set name show that the file is fixed
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(tmp + "/blank.mps", "w") as writer:
+                writer.write("NAME          BLANK\nROWS\n N  COST\n L  LIM1\nCOLUMNS\n")
+                writer.write("    X1        COST               1.0   LIM1               1.0\n")
+                writer.write("    X2        LIM1               1.0\n")
+                writer.write("RHS\n              LIM1               4.0\n")
+                writer.write("BOUNDS\n UP           X1                 4.0\n FR           X2\nENDATA\n")
+            self.assertEqual(mps_loader._file_format(tmp + "/blank.mps"), "fixed")
+            with open(tmp + "/blank.mps") as reader:
+                lines = reader.readlines()
+            self.assertEqual(mps_loader._detect_format(lines[:9])[0], "fixed")
+            self.assertEqual(mps_loader._detect_format(lines[:7] + lines[9:])[0], "fixed")
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                mps = read_mps(tmp + "/blank.mps")
+            self.assertEqual(mps.rhs[""]["LIM1"], 4.0)
+            self.assertEqual(mps.variables[""]["X1"]["upper"], 4.0)
+            self.assertEqual(mps.variables[""]["X2"]["lower"], -math.inf)
+        
+    def test_lazy_import(self):
+        # importing the package loads none of its modules and has no side effects on warnings
+        code = ("import sys, warnings; warnings.simplefilter('error'); import pysmps; "
+                "assert not [name for name in sys.modules if name.startswith('pysmps.')]; "
+                "assert pysmps.read_smps.__module__ == 'pysmps.smps_loader'; assert 'numpy' not in sys.modules")
+        subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(parent_dir), check=True)
+        
+    def test_profile_case04(self):
+        profile = mps_loader.ParseProfile(tracemalloc=True)
+        mps = read_mps(current_dir + "/case04", profile=profile)
+        self.assertIs(mps.profile, profile)
+        report = [r for r in profile.report() if r["section"] is not None]
+        self.assertEqual([r["section"] for r in report], ["NAME", "ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS", "ENDATA"])
+        self.assertEqual([r["lines"] for r in report], [1, 5, 6, 3, 3, 4, 1])
+        self.assertTrue(all(r["peak_memory"] is not None and r["tokens_per_second"] > 0 for r in report))
+        # mapped files give the same line and byte counts, without tokens
+        mapped = mps_loader.ParseProfile()
+        read_mps(current_dir + "/case04", profile=mapped, mmap=True)
+        self.assertEqual([(r["section"], r["lines"], r["bytes"]) for r in mapped.report()],
+                         [(r["section"], r["lines"], r["bytes"]) for r in report])
+        self.assertIsNone(read_mps(current_dir + "/case04").profile)
+        
+class TestSMPSReader(unittest.TestCase):
+    
+    def test_case03(self):
+        smps = dict(read_smps(current_dir + "/case03"))
+        self.assertEqual(smps["row_periods"], {"STAGE1": ["cap"], "STAGE2": ["dem1", "dem2"]})
+        self.assertEqual(smps["col_periods"], {"STAGE1": ["x"], "STAGE2": ["y1", "y2"]})
+        self.assertEqual(smps["distributions"], {"STAGE2": {
+            ("RHS", "dem1"): {"type": "DISCRETE", "probabilities": {2.0: 0.5, 4.0: 0.5}},
+            ("RHS", "dem2"): {"type": "BLOCK", "block": "BLOCK1"},
+            ("x", "dem2"): {"type": "BLOCK", "block": "BLOCK1"}
+        }})
+        self.assertEqual(smps["blocks"], {"STAGE2": {"BLOCK1": {
+            "type": "DISCRETE",
+            "elements": [("RHS", "dem2"), ("x", "dem2")],
+            "basecase": [3.0, 1.0],
+            "probabilities": {(3.0, 1.0): 0.6, (5.0, 1.0): 0.4}
+        }}})
+    
+    def test_block_realizations_case03(self):
+        block = read_smps(current_dir + "/case03").blocks["STAGE2"]["BLOCK1"]
+        self.assertEqual(block.positions, {("RHS", "dem2"): 0, ("x", "dem2"): 1})
+        self.assertEqual(block.realization(1), [5.0, 1.0])
+        cases, probabilities = block.realizations()
+        self.assertEqual(cases.tolist(), [[3.0, 1.0], [5.0, 1.0]])
+        self.assertEqual(probabilities.tolist(), [0.6, 0.4])
+    
+    def test_explicit_periods_case03(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(current_dir + "/case03.cor", tmp)
+            shutil.copy(current_dir + "/case03.sto", tmp)
+            with open(tmp + "/case03.tim", "w") as writer:
+                writer.write("TIME case03\nPERIODS EXPLICIT\n STAGE1\n STAGE2\nROWS\n obj STAGE1\n dem2 STAGE2\n cap STAGE1\n dem1 STAGE2\nCOLUMNS\n y2 STAGE2\n x STAGE1\n y1 STAGE2\nENDATA\n")
+            smps = read_smps(tmp + "/case03")
+        self.assertEqual(smps.get_periods(), ["STAGE1", "STAGE2"])
+        self.assertEqual(smps.row_periods, {"STAGE1": ["cap"], "STAGE2": ["dem1", "dem2"]})
+        self.assertEqual(smps.col_periods, {"STAGE1": ["x"], "STAGE2": ["y1", "y2"]})
+        self.assertEqual(list(smps.row_period_ids()), [0, 1, 1])
+    
+    def test_cache_case03(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            parsed = read_smps(current_dir + "/case03", cache_dir=tmp)
+            cached = read_smps(current_dir + "/case03", cache_dir=tmp)
+            self.assertEqual(dict(parsed), dict(cached))
+            self.assertEqual(cached.blocks["STAGE2"]["BLOCK1"].realization(1), [5.0, 1.0])
+            self.assertEqual(cached.distributions, parsed.distributions)
+            lintr = read_smps(current_dir + "/case07", cache_dir=tmp)
+            self.assertEqual(read_smps(current_dir + "/case07", cache_dir=tmp).blocks, lintr.blocks)
+            # truncated and garbled cache files are parsed again
+            for name in os.listdir(tmp):
+                with open(tmp + "/" + name, "r+b") as writer:
+                    writer.truncate(os.path.getsize(tmp + "/" + name) - 8)
+            self.assertEqual(dict(read_smps(current_dir + "/case03", cache_dir=tmp)), dict(parsed))
+            for content in [b"PYSMPS-CACHE\x02", b"PYSMPS-CACHE\x02\x00\x00\x00\x05\x00\x00\x00\x00\x00\x00\x00{nope"]:
+                for name in os.listdir(tmp):
+                    with open(tmp + "/" + name, "wb") as writer:
+                        writer.write(content)
+                self.assertEqual(dict(read_smps(current_dir + "/case03", cache_dir=tmp)), dict(parsed))
+    
+    def test_compressed_case03(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for suffix, compressed, opener in [(".cor", ".gz", gzip.open), (".tim", ".bz2", bz2.open), (".sto", ".gz", gzip.open)]:
+                with open(current_dir + "/case03" + suffix, "rb") as reader, opener(tmp + "/case03" + suffix + compressed, "wb") as writer:
+                    shutil.copyfileobj(reader, writer)
+            self.assertEqual(dict(read_smps(tmp + "/case03")), dict(read_smps(current_dir + "/case03")))
+        
+    def test_scenarios_case06(self):
+        smps = read_smps(current_dir + "/case06")
+        self.assertEqual(dict(smps)["scenarios"], {
+            "SCEN1": {"parent": "ROOT", "period": "STAGE2", "probability": 0.5,
+                      "changes": {("RHS", "dem1"): 2.0, ("RHS", "dem2"): 3.0, ("x", "dem2"): 1.0}},
+            "SCEN2": {"parent": "SCEN1", "period": "STAGE2", "probability": 0.3, "changes": {("RHS", "dem1"): 4.0}},
+            "SCEN3": {"parent": "ROOT", "period": "STAGE2", "probability": 0.2, "changes": {("RHS", "dem2"): 5.0}}})
+        self.assertEqual(smps.scenarios.path("SCEN2"), ["SCEN1", "SCEN2"])
+        self.assertEqual(smps.scenarios.realization("SCEN2"), {("RHS", "dem1"): 4.0, ("RHS", "dem2"): 3.0, ("x", "dem2"): 1.0})
+        self.assertRaises(ValueError, smps.scenarios.changes, "SCEN4")
+        with tempfile.TemporaryDirectory() as tmp:
+            read_smps(current_dir + "/case06", cache_dir=tmp)
+            self.assertEqual(dict(read_smps(current_dir + "/case06", cache_dir=tmp)), dict(smps))
+        
+    def test_deterministic_equivalent_case03(self):
+        de = read_smps(current_dir + "/case03").deterministic_equivalent()
+        # x, then (y1, y2) per scenario; the scenarios are (dem1, BLOCK1) = (2, 0), (2, 1), (4, 0), (4, 1)
+        self.assertEqual(de.matrix.shape, (9, 9))
+        self.assertEqual(de.matrix.toarray()[:, 0].tolist(), [1.0] * 9)
+        self.assertEqual(de.matrix[1:, 1:].toarray().tolist(), [[float(i == j) for j in range(8)] for i in range(8)])
+        self.assertEqual(de.probabilities.tolist(), [0.3, 0.2, 0.3, 0.2])
+        self.assertEqual(de.rhs.tolist(), [10.0, 2.0, 3.0, 2.0, 5.0, 4.0, 3.0, 4.0, 5.0])
+        self.assertEqual([round(c, 12) for c in de.objective.tolist()], [1.0, 0.9, 0.9, 0.6, 0.6, 0.9, 0.9, 0.6, 0.6])
+        self.assertEqual(de.row_types.tolist(), ["L"] + ["G"] * 8)
+        self.assertEqual(de.upper.tolist(), [8.0] + [math.inf] * 8)
+        self.assertEqual(de.col_origin.tolist(), [0, 1, 2, 1, 2, 1, 2, 1, 2])
+    
+    def test_deterministic_equivalent_case06(self):
+        # every scenario is complete, SCEN2 only takes its unchanged values from SCEN1
+        de = read_smps(current_dir + "/case06").deterministic_equivalent()
+        self.assertEqual(de.matrix.shape, (7, 7))
+        self.assertEqual(de.rhs.tolist(), [10.0, 2.0, 3.0, 4.0, 3.0, 2.0, 5.0])
+        self.assertEqual(de.probabilities.tolist(), [0.5, 0.3, 0.2])
+        self.assertAlmostEqual(de.probabilities.sum(), 1.0)
+        
+    def test_profile_case03(self):
+        profile = mps_loader.ParseProfile()
+        smps = read_smps(current_dir + "/case03", profile=profile)
+        self.assertIs(smps.profile, profile)
+        sections = [(r["file"], r["section"]) for r in profile.report() if not r["file"].endswith(".cor")]
+        self.assertEqual(sections, [("case03.tim", "TIME"), ("case03.tim", "PERIODS"), ("case03.tim", "ENDATA"),
+                                    ("case03.sto", "STOCH"), ("case03.sto", "INDEP"), ("case03.sto", "BLOCKS"), ("case03.sto", "ENDATA")])
+        
+    def test_sample_case03(self):
+        smps = read_smps(current_dir + "/case03")
+        values, elements = smps.sample(20000, seed=1)
+        self.assertEqual(elements, [("RHS", "dem1"), ("RHS", "dem2"), ("x", "dem2")])
+        self.assertEqual(values.shape, (20000, 3))
+        self.assertAlmostEqual((values[:, 0] == 2.0).mean(), 0.5, delta=0.02)
+        # the block elements are drawn together
+        self.assertEqual(set(map(tuple, values[:, 1:].tolist())), {(3.0, 1.0), (5.0, 1.0)})
+        self.assertAlmostEqual((values[:, 1] == 3.0).mean(), 0.6, delta=0.02)
+        self.assertEqual(smps.sample(10, seed=1)[0].tolist(), smps.sample(10, seed=1)[0].tolist())
+        self.assertNotEqual(smps.sample(10, seed=1, stream=0)[0].tolist(), smps.sample(10, seed=1, stream=1)[0].tolist())
+        self.assertEqual([len(chunk) for chunk in smps.sample_chunks(25, 10, seed=1)], [10, 10, 5])
+    
+    def test_sample_continuous(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for suffix in [".cor", ".tim"]:
+                shutil.copy(current_dir + "/case03" + suffix, tmp + "/case03" + suffix)
+            with open(tmp + "/case03.sto", "w") as writer:
+                writer.write("STOCH         case03\nINDEP         NORMAL\n    RHS       dem1      2.0       STAGE2    4.0\n"
+                             "INDEP         UNIFORM\n    RHS       dem2      1.0       STAGE2    3.0\nENDATA\n")
+            values, elements = read_smps(tmp + "/case03").sample(20000, seed=2)
+        self.assertEqual(elements, [("RHS", "dem1"), ("RHS", "dem2")])
+        self.assertAlmostEqual(values[:, 0].mean(), 2.0, delta=0.1)
+        self.assertAlmostEqual(values[:, 0].std(), 2.0, delta=0.1)
+        self.assertTrue(((values[:, 1] >= 1.0) & (values[:, 1] < 3.0)).all())
+        
+    def test_scenario_product_case03(self):
+        product = read_smps(current_dir + "/case03").scenario_product()
+        self.assertEqual(product.elements, [("RHS", "dem1"), ("RHS", "dem2"), ("x", "dem2")])
+        self.assertEqual(len(product), 4)
+        values, probability = product[1]
+        self.assertEqual((values.tolist(), probability), ([2.0, 5.0, 1.0], 0.2))
+        self.assertEqual(product[-1][0].tolist(), [4.0, 5.0, 1.0])
+        part = product[1:3]
+        self.assertEqual(len(part), 2)
+        self.assertEqual([values.tolist() for values, _ in part], [[2.0, 5.0, 1.0], [4.0, 3.0, 1.0]])
+        batches = list(product.batches(3))
+        self.assertEqual([len(probs) for _, probs in batches], [3, 1])
+        self.assertAlmostEqual(sum(probs.sum() for _, probs in batches), 1.0)
+        self.assertRaises(IndexError, product.__getitem__, 4)
+    
+    def test_scenario_product_random_access(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for suffix in [".cor", ".tim"]:
+                shutil.copy(current_dir + "/case03" + suffix, tmp + "/case03" + suffix)
+            with open(tmp + "/case03.sto", "w") as writer:
+                writer.write("STOCH         case03\nINDEP         DISCRETE\n")
+                for col in ["RHS", "x", "y1", "y2"]:
+                    for row in ["obj", "cap", "dem1", "dem2"]:
+                        writer.write("    %s %s 0.0 STAGE2 0.5\n    %s %s 1.0 STAGE2 0.5\n" % (col, row, col, row))
+                writer.write("ENDATA\n")
+            product = read_smps(tmp + "/case03").scenario_product()
+        self.assertEqual(len(product), 2 ** 16)
+        # scenario k has the binary digits of k as values
+        values, probability = product[12345]
+        self.assertEqual(values.tolist(), [float(d) for d in format(12345, "016b")])
+        self.assertEqual(probability, 0.5 ** 16)
+        self.assertEqual(product[12000:13000][345][0].tolist(), values.tolist())
+        
+    def test_scenario_product_count(self):
+        import numpy as np
+        # 2 ** 70 scenarios, scenario k has the binary digits of k as values
+        factors = [([("RHS", "r" + str(i))], np.array([[0.0], [1.0]]), np.array([0.5, 0.5])) for i in range(70)]
+        product = smps_loader._ScenarioProduct(factors)
+        self.assertEqual(product.count, 2 ** 70)
+        self.assertRaises(OverflowError, len, product)
+        for k in [5, 2 ** 65, 2 ** 70 - 1]:
+            self.assertEqual(product[k][0].tolist(), [float(d) for d in format(k, "070b")])
+        self.assertEqual(product[-1][0].tolist(), [1.0] * 70)
+        self.assertRaises(IndexError, product.__getitem__, 2 ** 70)
+        part = product[2 ** 64 - 3:2 ** 64 + 3]
+        self.assertEqual((part.count, len(part)), (6, 6))
+        values = np.vstack([batch for batch, _ in part.batches(4)])
+        self.assertEqual(values.tolist(), [product[2 ** 64 - 3 + k][0].tolist() for k in range(6)])
+        self.assertEqual(part[4][0].tolist(), product[2 ** 64 + 1][0].tolist())
+        
+    def test_lintr_case07(self):
+        import numpy as np
+        smps = read_smps(current_dir + "/case07")
+        transform = smps.lintr_transform()
+        self.assertEqual(transform.elements, [("RHS", "dem1"), ("RHS", "dem2"), ("x", "dem2")])
+        self.assertEqual(transform.variables, [("STAGE2", "BLOCK1", "U1"), ("STAGE2", "BLOCK1", "U2"), ("STAGE2", "BLOCK1", "U3")])
+        self.assertEqual(transform.matrix.toarray().tolist(), [[1.0, 0.0, 0.0], [0.5, 1.0, 0.0], [0.0, -0.25, 0.5]])
+        self.assertEqual(transform.realize(np.array([[1.0, 2.0, 1.0], [0.0, 0.0, 0.0]])).tolist(), [[3.0, 5.5, 1.0], [2.0, 3.0, 1.0]])
+        # U1 ~ NORMAL(0, 1), U2 ~ UNIFORM(0, 2) and U3 = 1
+        values, elements = smps.sample(20000, seed=3)
+        self.assertEqual(elements, transform.elements)
+        for mean, expected in zip(values.mean(axis=0).tolist(), [2.0, 4.0, 1.25]):
+            self.assertAlmostEqual(mean, expected, delta=0.05)
+        
+class TestReadMany(unittest.TestCase):
+    
+    def test_read_many(self):
+        paths = [current_dir + "/case04", current_dir + "/case03", current_dir + "/missing", current_dir + "/case05"]
+        for workers, ordered in [(1, True), (2, True), (2, False)]:
+            results = list(read_many(paths, workers=workers, ordered=ordered, sparse=True))
+            if ordered:
+                self.assertEqual([result.index for result in results], [0, 1, 2, 3])
+            results = sorted(results, key=lambda result: result.index)
+            self.assertEqual([result.path for result in results], paths)
+            self.assertEqual(dict(results[0].result), dict(read_mps(paths[0], sparse=True)))
+            self.assertEqual(dict(results[1].result), dict(read_smps(paths[1], sparse=True)))
+            self.assertEqual(results[3].result.name, "TEST 05")
+            # a missing file is reported without stopping the others
+            self.assertIsNone(results[2].result)
+            self.assertIsInstance(results[2].error, FileNotFoundError)
+            self.assertTrue(all(result.error is None for k, result in enumerate(results) if k != 2))
+        
+    def test_read_many_directory(self):
+        # a directory named like the instance is no MPS file
+        with tempfile.TemporaryDirectory() as tmp:
+            os.mkdir(tmp + "/case03")
+            for suffix in [".cor", ".tim", ".sto"]:
+                shutil.copy(current_dir + "/case03" + suffix, tmp + "/case03" + suffix)
+            result = next(read_many([tmp + "/case03"], workers=1))
+        self.assertIsNone(result.error)
+        self.assertEqual(dict(result.result), dict(read_smps(current_dir + "/case03")))
+        
+class TestAsyncReader(unittest.TestCase):
+    
+    def test_aread_case03(self):
+        async def read():
+            limiter = asyncio.Semaphore(1)
+            return await asyncio.gather(aread_mps(current_dir + "/case04", limiter=limiter),
+                                        aread_smps(current_dir + "/case03", limiter=limiter))
+        mps, smps = asyncio.run(read())
+        self.assertEqual(dict(mps), dict(read_mps(current_dir + "/case04")))
+        self.assertEqual(dict(smps), dict(read_smps(current_dir + "/case03")))
+        self.assertEqual(dict(read_smps(current_dir + "/case03", prefetch=True)), dict(smps))
+        
+    def test_aread_process_pool(self):
+        from concurrent.futures import ProcessPoolExecutor
+        with tempfile.TemporaryDirectory() as tmp:
+            # a file named like the instance does not turn aread_smps into aread_mps
+            for suffix in [".cor", ".tim", ".sto"]:
+                shutil.copy(current_dir + "/case03" + suffix, tmp + "/case03" + suffix)
+            shutil.copy(current_dir + "/case04", tmp + "/case03")
+            with ProcessPoolExecutor(1) as executor:
+                smps = asyncio.run(aread_smps(tmp + "/case03", executor=executor))
+                mps = asyncio.run(aread_mps(tmp + "/case03", executor=executor))
+        self.assertEqual(dict(smps), dict(read_smps(current_dir + "/case03")))
+        self.assertEqual(dict(mps), dict(read_mps(current_dir + "/case04")))
+        
+    def test_cancel(self):
+        cancel = threading.Event()
+        cancel.set()
+        self.assertRaises(mps_loader.ParseCancelled, read_mps, current_dir + "/case04", cancel=cancel)
+        self.assertRaises(mps_loader.ParseCancelled, read_smps, current_dir + "/case03", cancel=cancel)
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(tmp + "/large.mps", "w") as writer:
+                writer.write("NAME large\nROWS\n N  obj\n L  c\nCOLUMNS\n")
+                writer.writelines("    x%d  obj  1.0  c  2.0\n" % j for j in range(200000))
+                writer.write("ENDATA\n")
+            async def cancelled():
+                limiter = asyncio.Semaphore(1)
+                task = asyncio.ensure_future(aread_mps(tmp + "/large.mps", limiter=limiter))
+                waiting = asyncio.ensure_future(aread_mps(current_dir + "/case04", limiter=limiter))
+                await asyncio.sleep(0.05)
+                task.cancel()
+                waiting.cancel()
+                for future in (task, waiting):
+                    with self.assertRaises(asyncio.CancelledError):
+                        await future
+                # the slot is given back once the parse has stopped
+                await asyncio.wait_for(limiter.acquire(), 10)
+            asyncio.run(cancelled())
+            # memory-mapped COLUMNS sections are checked batch by batch, not only at their start
+            class Countdown:
+                calls = 0
+                def is_set(self):
+                    self.calls += 1
+                    return self.calls > 5
+            countdown = Countdown()
+            self.assertRaises(mps_loader.ParseCancelled, read_mps, tmp + "/large.mps", mmap=True, cancel=countdown)
+            self.assertEqual(countdown.calls, 6)
+        
 class TestMPSWriter(unittest.TestCase):
     
+    def assertRoundTrip(self, mps, path, **kwargs):
+        write_mps(mps, path, **kwargs)
+        written = read_mps(path, sparse=mps.is_sparse())
+        self.assertEqual(dict(written), dict(mps))
+        self.assertEqual(written.variable_names(), mps.variable_names())
+        self.assertEqual((written.to_csr() != mps.to_csr()).nnz, 0)
+        for name, group in mps.variables.items():
+            self.assertEqual(written.variables[name].overrides, group.overrides)
+    
     def test_case01(self):
-        return
+        with tempfile.TemporaryDirectory() as tmp:
+            for sparse in [False, True]:
+                for format in ["free", "fixed"]:
+                    self.assertRoundTrip(read_mps(current_dir + "/case01", sparse=sparse), tmp + "/case01.mps", format=format)
+    
+    def test_compressed_case04(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for suffix in [".gz", ".bz2", ".xz"]:
+                self.assertRoundTrip(read_mps(current_dir + "/case04"), tmp + "/case04.mps" + suffix)
+    
+    def test_fixed_format_case05(self):
+        mps = read_mps(current_dir + "/case05")
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertRoundTrip(mps, tmp + "/case05.mps", format="fixed")
+            # names containing spaces can only be written in fixed format
+            self.assertRaises(ValueError, write_mps, mps, tmp + "/case05.mps", format="free")
+    
+    def test_equality_ranges(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(tmp + "/ranges.mps", "w") as writer:
+                writer.write("NAME ranges\nROWS\n N obj\n E eq1\n E eq2\nCOLUMNS\n    x obj 1.0 eq1 1.0\n    x eq2 1.0\n"
+                             "RHS\n    RHS eq1 1.0 eq2 2.0\nRANGES\n    RNG eq1 -2.0 eq2 3.0\nENDATA\n")
+            mps = read_mps(tmp + "/ranges.mps")
+            self.assertEqual(mps.ranges, {"RNG": {"eq1": {"lower": -2.0, "upper": 0}, "eq2": {"lower": 0, "upper": 3.0}}})
+            self.assertRoundTrip(mps, tmp + "/written.mps")
     
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -16,5 +16,7 @@ setup(
     author_email='maertej@students.uni-marburg.de',
     packages=find_packages(),
 	url="https://github.com/jmaerte/pysmps",
-	install_required=required,
+	install_requires=required,
+	# MPS.to_csr/to_csc, SMPS.lintr_transform and SMPS.deterministic_equivalent
+	extras_require={"scipy": ["scipy"]},
 )